@@ -73,7 +73,8 @@ while True:
         # If no hands detected, stop all chords after delay
         for hand in chords:
             for finger in chords[hand]:
-                threading.Thread(target=stop_chord_after_delay, args=(chords[hand][finger],), daemon=True).start()
+                if prev_states[hand][finger] == 1:  # Only if it was playing
+                    threading.Thread(target=stop_chord_after_delay, args=(chords[hand][finger],), daemon=True).start()
         prev_states = {hand: {finger: 0 for finger in chords[hand]} for hand in chords}
 
     cv2.imshow("Hand Tracking MIDI Chords", img)
@@ -0,0 +1,95 @@
+# -*- mode: python ; coding: utf-8 -*-
+"""
+Fast-starting PyInstaller spec for Air-Piano
+Builds an unpacked onedir layout (nothing is extracted to a temp dir at
+launch) and keeps only the parts of MediaPipe and OpenCV the app uses:
+the hand landmark / palm detection graphs and models, and cv2 without its
+Haar cascades and stubs. Works on Windows, macOS and Linux:
+
+    pyinstaller air_piano_fast.spec
+"""
+
+import sys
+from pathlib import Path
+from PyInstaller.utils.hooks import collect_data_files, collect_dynamic_libs
+
+spec_root = Path(SPECPATH)
+
+# MediaPipe solutions the app uses; their graphs and .tflite models live in
+# mediapipe/modules/<name>/
+MEDIAPIPE_MODULES = ('hand_landmark', 'palm_detection')
+# Large packages MediaPipe or its dependencies can drag in that the app never imports
+EXCLUDES = [
+    'tensorflow', 'torch', 'jax', 'jaxlib', 'keras', 'pandas', 'scipy', 'sklearn',
+    'IPython', 'notebook', 'tkinter', 'PyQt5', 'PyQt6', 'PySide2', 'PySide6',
+    'mediapipe.tasks.python.genai', 'mediapipe.model_maker',
+]
+
+mediapipe_datas = collect_data_files(
+    'mediapipe', includes=[f'modules/{name}/**' for name in MEDIAPIPE_MODULES])
+
+a = Analysis(
+    ['air_piano_main.py'],
+    pathex=[str(spec_root)],
+    binaries=collect_dynamic_libs('mediapipe'),
+    datas=mediapipe_datas,
+    hiddenimports=[
+        'mediapipe.python.solutions.hands',
+        'mediapipe.python.solutions.drawing_utils',
+        'pygame.midi',
+        'pygame.mixer',
+        'pygame.sndarray',
+        'sounddevice',
+    ],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=EXCLUDES,
+    noarchive=False,
+)
+
+
+def keep(entry):
+    """Drop MediaPipe models for other solutions and OpenCV data we never load"""
+    dest = entry[0].replace('\\', '/')
+    if dest.startswith('mediapipe/modules/'):
+        return dest.split('/')[2] in MEDIAPIPE_MODULES
+    if dest.startswith('cv2/data/'):           # Haar cascades
+        return False
+    if dest.startswith('cv2/') and dest.endswith(('.pyi', 'py.typed')):
+        return False
+    return True
+
+
+a.datas = [entry for entry in a.datas if keep(entry)]
+a.binaries = [entry for entry in a.binaries if keep(entry)]
+
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,  # onedir: libraries stay next to the executable
+    name='Air-Piano',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,              # UPX-packed libraries must be decompressed on every launch
+    console=sys.platform != 'win32',
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon='piano.ico' if Path('piano.ico').exists() else None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    name='Air-Piano',
+)
@@ -3,173 +3,318 @@ Air-Piano - Hand Gesture MIDI Controller
 Updated for Python 3.8+ compatibility using MediaPipe instead of cvzone
 """
 
+import os
 import sys
+import signal
 import cv2
 import threading
 import time
 import numpy as np
-import mediapipe as mp
 import pygame
+from frame_sources import CameraSource, open_frame_source, PACING_REALTIME, PACING_FAST
+from note_scheduler import NoteScheduler
+from voice_manager import VoiceManager
+from midi_output import MidiOutput, PygameMidiBackend
+from tone_bank import SoundBank
+from soft_synth import SoftSynth, SynthMidiBackend, ADSR
+from sample_piano import SampleBank, SamplePiano
+from hud import HudOverlay
+from hand_detector import HandDetector
+from detection_pipeline import DetectionPipeline
+from stage_timing import StageTimer
+from startup import Startup, draw_progress
+from session_recorder import SessionRecorder
+from chord_mapping import (HANDS, FINGERS, FINGERS_PER_HAND, CHORD_MODE_FINGERS, CHORD_MODE_COMBO,
+                           MappingWatcher, load_mapping, default_mapping)
+from landmark_recording import LandmarkRecorder, LandmarkRecording, HAND_LEFT, NUM_LANDMARKS
 
 print(f"✅ Python {sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}")
 print("✅ Using MediaPipe for hand tracking (Python 3.8+ compatible)")
 
-# MediaPipe Hand Detection (replaces cvzone)
-class HandDetector:
-    def __init__(self, detectionCon=0.8):
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,
-            min_detection_confidence=detectionCon,
-            min_tracking_confidence=0.5
-        )
-        self.mp_draw = mp.solutions.drawing_utils
-    
-    def findHands(self, img, draw=True):
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(img_rgb)
-        hands_data = []
-        
-        if results.multi_hand_landmarks:
-            for hand_idx, hand_landmarks in enumerate(results.multi_hand_landmarks):
-                if draw:
-                    self.mp_draw.draw_landmarks(img, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
-                
-                # Get hand type (Left/Right)
-                hand_type = results.multi_handedness[hand_idx].classification[0].label
-                
-                # Extract landmark positions
-                landmarks = []
-                for landmark in hand_landmarks.landmark:
-                    h, w, c = img.shape
-                    cx, cy = int(landmark.x * w), int(landmark.y * h)
-                    landmarks.append([cx, cy])
-                
-                hands_data.append({
-                    "type": hand_type,
-                    "landmarks": landmarks
-                })
-        
-        return hands_data, img
+# Pipelined capture: grab frames on a background thread (latest frame wins)
+class LatestFrameGrabber:
+    """Reads frames on its own thread and keeps only the newest one.
+
+    When hand detection is slower than the camera, stale frames are dropped
+    here instead of queueing up in the driver buffer.
+    """
+    def __init__(self, cap):
+        self.cap = cap
+        self.cond = threading.Condition()
+        self.frame = None
+        self.captured_at = 0.0
+        self.seq = 0          # Sequence number of the newest captured frame
+        self.read_seq = 0     # Sequence number of the last frame handed out
+        self.dropped = 0      # Frames captured but never handed out
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def _capture_loop(self):
+        while self.running:
+            success, img = self.cap.read()
+            if not success:
+                time.sleep(0.01)
+                continue
+            with self.cond:
+                self.frame = img
+                self.captured_at = time.perf_counter()
+                self.seq += 1
+                self.cond.notify()
+
+    def read(self, timeout=1.0):
+        """Wait for a frame newer than the last one read.
+
+        Returns (success, img, captured_at) where captured_at is the
+        time.perf_counter() timestamp of when the frame left the camera.
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq > self.read_seq or not self.running, timeout)
+            if self.seq == self.read_seq:
+                return False, None, 0.0
+            self.dropped += self.seq - self.read_seq - 1
+            self.read_seq = self.seq
+            return True, self.frame, self.captured_at
+
+    def stop(self):
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+# Display modes: full window every frame, no window at all, or a decimated preview
+DISPLAY_WINDOW = "window"
+DISPLAY_HEADLESS = "headless"
+DISPLAY_PREVIEW = "preview"
+WINDOW_TITLE = "Air-Piano - Hand Gesture MIDI Controller"
+
+# Decimated preview: render landmarks and HUD off the detection/trigger path
+class PreviewRenderer:
+    """Draws and shows the newest frame snapshot on its own thread.
+
+    submit() only swaps in a reference to the latest frame and its results,
+    so the frame loop never waits on drawing or cv2.imshow. The thread
+    renders at most fps times per second and skips any frames in between.
+    Pressing 'q' in the preview window sets stop_event.
+    """
+    def __init__(self, detector, stop_event, fps=10):
+        self.detector = detector
+        self.stop_event = stop_event
+        self.interval = 1.0 / fps
+        self.cond = threading.Condition()
+        self.snapshot = None
+        self.rendered = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._render_loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def submit(self, img, landmarks, handedness, stats_text=None):
+        """Hand over a frame the caller will not modify again"""
+        with self.cond:
+            self.snapshot = (img, landmarks, stats_text, tuple(current_chords))
+            self.cond.notify()
+
+    def _render_loop(self):
+        next_time = time.perf_counter()
+        while self.running:
+            with self.cond:
+                self.cond.wait_for(lambda: self.snapshot is not None or not self.running, 0.5)
+                snapshot, self.snapshot = self.snapshot, None
+            if snapshot is None:
+                continue
+            img, landmarks, stats_text, playing = snapshot
+            self.detector.drawLandmarks(img, landmarks)
+            draw_instructions(img, stats_text, playing)
+            cv2.imshow(WINDOW_TITLE, img)
+            self.rendered += 1
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                self.stop_event.set()
+            # Sleep off the rest of the frame interval; newer snapshots replace older ones meanwhile
+            next_time = max(next_time + self.interval, time.perf_counter())
+            time.sleep(max(next_time - time.perf_counter(), 0.0))
+
+    def stop(self):
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+def watch_stdin_for_quit(stop_event):
+    """Set stop_event when 'q' or 'quit' is typed on stdin; for runs without a window.
+
+    Returns False when there is no stdin to watch (sys.stdin is None in
+    --windowed / console=False builds), leaving only signals to stop the run.
+    """
+    if sys.stdin is None:
+        return False
+    def _watch():
+        for line in sys.stdin:
+            if line.strip().lower() in ("q", "quit"):
+                stop_event.set()
+                return
+    threading.Thread(target=_watch, daemon=True).start()
+    return True
+
+# Scheduling latency for MIDI output (ms); evens out onset timing under load
+MIDI_LATENCY_MS = 10
+
+# Audio state, filled in by init_audio() / init_mixer() during startup
+midi_out = None
+synth = None
+MIDI_AVAILABLE = False
+SYNTH_ACTIVE = False
+SOUND_AVAILABLE = False
+
+# Built-in software synth when there is no MIDI port (needs sounddevice)
+SYNTH_BLOCK_SIZE = 256    # Samples per audio callback (~6 ms at 44.1 kHz)
+SYNTH_RELEASE_TIME = 1.5  # Envelope release (s); replaces SUSTAIN_TIME for the synth
+# Folder of note-named WAV piano samples (e.g. C4.wav, 62.wav); used instead of
+# the sine synth when present
+PIANO_SAMPLES_DIR = "piano_samples"
+
+def init_audio():
+    """Open MIDI output 0, or start the built-in synth when there is no MIDI port"""
+    global midi_out, synth, MIDI_AVAILABLE, SYNTH_ACTIVE
+    # Try to import pygame for MIDI, but handle gracefully if no MIDI device
+    try:
+        import pygame.midi
+        pygame.midi.init()
+        # Check if any MIDI devices are available
+        midi_device_count = pygame.midi.get_count()
+        if midi_device_count > 0:
+            midi_out = MidiOutput(PygameMidiBackend(0, latency_ms=MIDI_LATENCY_MS, instrument=0))
+            MIDI_AVAILABLE = True
+            print("✅ MIDI output initialized successfully!")
+        else:
+            MIDI_AVAILABLE = False
+            print("⚠️ No MIDI devices found. Audio feedback disabled.")
+    except Exception as e:
+        MIDI_AVAILABLE = False
+        print(f"⚠️ MIDI initialization failed: {e}")
+        print("💡 To enable audio, install loopMIDI from: https://www.tobias-erichsen.de/software/loopmidi.html")
     
-    def fingersUp(self, hand_data):
-        """Determine which fingers are up based on landmark positions"""
-        landmarks = hand_data["landmarks"]
-        fingers = []
-        
-        # Tip and PIP landmark IDs for each finger
-        tip_ids = [4, 8, 12, 16, 20]  # Thumb, Index, Middle, Ring, Pinky
-        pip_ids = [3, 6, 10, 14, 18]   # PIP joints
-        
-        # Thumb (special case - check x-coordinate)
-        if hand_data["type"] == "Right":
-            fingers.append(1 if landmarks[tip_ids[0]][0] > landmarks[pip_ids[0]][0] else 0)
+    if MIDI_AVAILABLE:
+        return
+    try:
+        if os.path.isdir(PIANO_SAMPLES_DIR):
+            synth = SamplePiano(SampleBank(PIANO_SAMPLES_DIR), block_size=SYNTH_BLOCK_SIZE,
+                                release=SYNTH_RELEASE_TIME)
+            # Resample every finger and combo chord note now rather than on the first trigger
+            synth.bank.preload(active_mapping.all_notes())
+            print(f"✅ Loaded piano samples from {PIANO_SAMPLES_DIR}/")
         else:
-            fingers.append(1 if landmarks[tip_ids[0]][0] < landmarks[pip_ids[0]][0] else 0)
-        
-        # Other fingers (check y-coordinate - tip should be above PIP when extended)
-        for i in range(1, 5):
-            fingers.append(1 if landmarks[tip_ids[i]][1] < landmarks[pip_ids[i]][1] else 0)
-        
-        return fingers
-
-# Try to import pygame for MIDI, but handle gracefully if no MIDI device
-try:
-    import pygame.midi
-    pygame.midi.init()
-    # Check if any MIDI devices are available
-    midi_device_count = pygame.midi.get_count()
-    if midi_device_count > 0:
-        player = pygame.midi.Output(0)
-        player.set_instrument(0)  # 0 = Acoustic Grand Piano
+            synth = SoftSynth(block_size=SYNTH_BLOCK_SIZE, envelope=ADSR(release=SYNTH_RELEASE_TIME))
+        synth.start()
+        midi_out = MidiOutput(SynthMidiBackend(synth))
         MIDI_AVAILABLE = True
-        print("✅ MIDI output initialized successfully!")
-    else:
-        MIDI_AVAILABLE = False
-        print("⚠️ No MIDI devices found. Audio feedback disabled.")
-except Exception as e:
-    MIDI_AVAILABLE = False
-    print(f"⚠️ MIDI initialization failed: {e}")
-    print("💡 To enable audio, install loopMIDI from: https://www.tobias-erichsen.de/software/loopmidi.html")
-
-# Try to import pygame for sound effects as backup
-try:
-    pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
-    SOUND_AVAILABLE = True
-    print("✅ Pygame mixer initialized for sound effects!")
-except Exception as e:
-    SOUND_AVAILABLE = False
-    print(f"⚠️ Sound initialization failed: {e}")
-
-# 🎐 Initialize Hand Detector
-cap = cv2.VideoCapture(0)
-detector = HandDetector(detectionCon=0.8)
-
-# 🎺 Chord Mapping for Fingers (D Major Scale)
-chords = {
-    "left": {
-        "thumb": [62, 66, 69],   # D Major (D, F#, A)
-        "index": [64, 67, 71],   # E Minor (E, G, B)
-        "middle": [66, 69, 73],  # F# Minor (F#, A, C#)
-        "ring": [67, 71, 74],    # G Major (G, B, D)
-        "pinky": [69, 73, 76]    # A Major (A, C#, E)
-    },
-    "right": {
-        "thumb": [62, 66, 69],   # D Major (D, F#, A)
-        "index": [64, 67, 71],   # E Minor (E, G, B)
-        "middle": [66, 69, 73],  # F# Minor (F#, A, C#)
-        "ring": [67, 71, 74],    # G Major (G, B, D)
-        "pinky": [69, 73, 76]    # A Major (A, C#, E)
-    }
-}
-
-# Chord names for display
-chord_names = {
-    "left": {
-        "thumb": "D Major",
-        "index": "E Minor", 
-        "middle": "F# Minor",
-        "ring": "G Major",
-        "pinky": "A Major"
-    },
-    "right": {
-        "thumb": "D Major",
-        "index": "E Minor",
-        "middle": "F# Minor", 
-        "ring": "G Major",
-        "pinky": "A Major"
-    }
-}
+        SYNTH_ACTIVE = True
+        print("✅ Built-in synthesizer started (no loopMIDI needed)")
+    except Exception as e:
+        print(f"⚠️ Built-in synthesizer unavailable: {e}")
+
+def init_mixer():
+    """Initialize the pygame mixer for the fallback beeps"""
+    global SOUND_AVAILABLE
+    # Try to import pygame for sound effects as backup
+    try:
+        pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+        SOUND_AVAILABLE = True
+        print("✅ Pygame mixer initialized for sound effects!")
+    except Exception as e:
+        SOUND_AVAILABLE = False
+        print(f"⚠️ Sound initialization failed: {e}")
+
+def add_audio_tasks(startup):
+    """Queue MIDI/synth and mixer initialization on a Startup"""
+    startup.add("MIDI / synth", init_audio)
+    startup.add("sound mixer", init_mixer)
+
+# 🎐 Hand detector and frame source are created in main(), in parallel
+cap = None
+detector = None
+
+# Per-stage latency timings (off unless --timing / --timing-dump)
+timing = StageTimer()
+TIMING_OVERLAY_REFRESH = 15  # Frames between overlay text updates
+
+# 🎺 Chord Mapping for Fingers (D Major Scale unless a mapping file says otherwise)
+# Compiled from chord_mapping.json by main(); the watcher thread replaces the
+# whole table in one assignment, and the frame loop reads it once per frame
+active_mapping = default_mapping()
+# Mapping the currently held chords were started with (frame loop only)
+playing_mapping = active_mapping
+DEFAULT_MAPPING_PATH = "chord_mapping.json"
+
+chord_mode = CHORD_MODE_FINGERS
 
 # Sustain Time (in seconds) after the finger is lowered
 SUSTAIN_TIME = 2.0
 
-# Track Previous States to Stop Chords
-prev_states = {hand: {finger: 0 for finger in chords[hand]} for hand in chords}
+# Track Previous States to Stop Chords (5-bit finger mask per hand)
+prev_states = {hand: 0 for hand in HANDS}
 
-# Track currently playing chords for display
+# Track currently playing chords for display (one entry per held finger)
 current_chords = []
 
+# Reference counts for every sounding (channel, note) across both hands
+voices = VoiceManager()
+
+# Single timer thread that owns every pending note-off
+note_scheduler = NoteScheduler()
+
+def voice_on(velocity):
+    """VoiceManager.press callback that queues a (channel, note) note-on, or None without MIDI"""
+    if not MIDI_AVAILABLE:
+        return None
+    return lambda voice: midi_out.note_on(voice[1], velocity, voice[0])
+
+def voice_off():
+    """VoiceManager.release callback that queues a (channel, note) note-off, or None without MIDI"""
+    if not MIDI_AVAILABLE:
+        return None
+    return lambda voice: midi_out.note_off(voice[1], 127, voice[0])
+
 # 🎵 Function to Play a Chord
-def play_chord(chord_notes, chord_name):
-    if MIDI_AVAILABLE:
-        for note in chord_notes:
-            player.note_on(note, 127)  # Start playing
+def play_chord(chord_notes, chord_name, velocity=127, channel=0):
+    # Only notes that are not already sounding for another chord, queued
+    # under the voice lock (sent with the frame's batch)
+    voices.press([(channel, note) for note in chord_notes], voice_on(velocity))
     
     # Add visual feedback
-    if chord_name not in current_chords:
-        current_chords.append(chord_name)
+    current_chords.append(chord_name)
     
     print(f"🎵 Playing: {chord_name}")
 
 # 🎵 Function to Stop a Chord After a Delay
-def stop_chord_after_delay(chord_notes, chord_name):
-    time.sleep(SUSTAIN_TIME)  # Sustain for specified time
-    
+def stop_chord_after_delay(chord_notes, chord_name, key=None, channel=0):
+    """Schedule the note-off SUSTAIN_TIME from now.
+
+    key identifies the held chord (see finger_key); a later call with the
+    same key, or note_scheduler.cancel(key), replaces the pending note-off.
+    The built-in synth releases right away and lets its envelope fade out.
+    """
+    delay = 0.0 if SYNTH_ACTIVE else SUSTAIN_TIME
+    note_scheduler.schedule(key if key is not None else (tuple(chord_notes), chord_name),
+                            delay, stop_chord, chord_notes, chord_name, channel)
+
+# 🎵 Function to Stop a Chord
+def stop_chord(chord_notes, chord_name, channel=0):
+    # Only notes that no other held chord still needs
+    voices.release([(channel, note) for note in chord_notes], voice_off())
     if MIDI_AVAILABLE:
-        for note in chord_notes:
-            player.note_off(note, 127)  # Stop playing
+        midi_out.flush()  # Runs on the scheduler thread, outside any frame batch
     
     # Remove from current chords display
     if chord_name in current_chords:
@@ -177,129 +322,503 @@ def stop_chord_after_delay(chord_notes, chord_name):
     
     print(f"🎵 Stopped: {chord_name}")
 
-# Function to generate a simple beep sound as fallback
-def generate_beep(frequency=440, duration=0.1):
-    if SOUND_AVAILABLE:
-        sample_rate = 22050
-        frames = int(duration * sample_rate)
-        
-        # Create stereo array (2 channels)
-        arr = np.zeros((frames, 2))
-        
-        for i in range(frames):
-            # Apply fade in/out to avoid clicks
-            fade = min(i / (frames * 0.1), (frames - i) / (frames * 0.1), 1.0)
-            wave = np.sin(2 * np.pi * frequency * i / sample_rate) * fade
-            arr[i, 0] = wave  # Left channel
-            arr[i, 1] = wave  # Right channel
-        
-        arr = (arr * 32767).astype(np.int16)
-        sound = pygame.sndarray.make_sound(arr)
-        sound.play()
+def finger_key(mapping, h, i):
+    """Scheduler key of one finger's chord; the same chord under a new mapping keeps its key"""
+    return (HANDS[h], FINGERS[i], mapping.channels[h], mapping.notes[h * FINGERS_PER_HAND + i])
 
-def draw_instructions(img):
-    """Draw instructions and status on the image"""
-    height, width = img.shape[:2]
+# 🎵 Function to Start One Finger's Chord
+def press_finger(mapping, h, i):
+    k = h * FINGERS_PER_HAND + i
+    chord_notes = mapping.notes[k]
+    if not chord_notes:  # Only assigned fingers play
+        return
+    # Raised again inside the sustain window: the chord is still held
+    if note_scheduler.cancel(finger_key(mapping, h, i)):
+        return
+    play_chord(chord_notes, mapping.names[k], mapping.velocities[k], mapping.channels[h])
     
-    # Semi-transparent overlay
-    overlay = img.copy()
-    cv2.rectangle(overlay, (10, 10), (width-10, 150), (0, 0, 0), -1)
-    cv2.addWeighted(overlay, 0.7, img, 0.3, 0, img)
-    
-    # Instructions
-    cv2.putText(img, "Air-Piano - Hand Gesture MIDI Controller", (20, 35), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+    # Fallback chord sound if no MIDI
+    if not MIDI_AVAILABLE and SOUND_AVAILABLE:
+        sound_bank.play_chord(chord_notes)
+
+# 🎵 Function to Release One Finger's Chord
+def release_finger(mapping, h, i):
+    k = h * FINGERS_PER_HAND + i
+    if mapping.notes[k]:
+        stop_chord_after_delay(mapping.notes[k], mapping.names[k], finger_key(mapping, h, i),
+                               mapping.channels[h])
+
+# 🎵 Function to Move a Hand From One Finger Combination to Another
+def change_combo_chord(mapping, h, prev_mask, mask):
+    """Emit only the notes that differ between the two masks' chords.
+
+    Each note's release is scheduled under its own (hand, channel, note)
+    key, so a note that comes back inside the sustain window simply keeps
+    sounding.
+    """
+    hand, channel = HANDS[h], mapping.channels[h]
+    table = mapping.combo[h]
+    note_ons, note_offs = table.transition(prev_mask, mask)
+    delay = 0.0 if SYNTH_ACTIVE else SUSTAIN_TIME
+    for note in note_offs:
+        note_scheduler.schedule((hand, channel, note), delay, stop_notes, ((channel, note),))
+    fresh = [(channel, note) for note in note_ons if not note_scheduler.cancel((hand, channel, note))]
+    voices.press(fresh, voice_on(mapping.hand_velocities[h]))
+    if not MIDI_AVAILABLE and note_ons and SOUND_AVAILABLE:
+        sound_bank.play_chord(table.notes[mask])
     
-    # Audio status
+    # Display the hand's current combination chord
+    if prev_mask and table.names[prev_mask] in current_chords:
+        current_chords.remove(table.names[prev_mask])
+    if mask and table.names[mask]:
+        current_chords.append(table.names[mask])
+        print(f"🎵 Playing: {table.names[mask]}")
+
+# 🎵 Function to Stop Individual (channel, note) Voices
+def stop_notes(voice_keys):
+    voices.release(voice_keys, voice_off())
     if MIDI_AVAILABLE:
-        cv2.putText(img, "MIDI Audio: ON", (20, 60), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+        midi_out.flush()  # Runs on the scheduler thread, outside any frame batch
+
+def change_hand(mapping, h, prev_mask, mask):
+    """Start and release whatever differs between two finger masks of one hand"""
+    if chord_mode == CHORD_MODE_COMBO:
+        # One table lookup covers every finger of this hand
+        change_combo_chord(mapping, h, prev_mask, mask)
+        return
+    changed = prev_mask ^ mask
+    for i in range(FINGERS_PER_HAND):
+        bit = 1 << i
+        if not changed & bit:
+            continue
+        if mask & bit:
+            press_finger(mapping, h, i)
+        else:
+            release_finger(mapping, h, i)
+
+def retune_held(old, new):
+    """Move held fingers from the old mapping's chords to the new one's.
+
+    Chords that are identical in both keep sounding; the rest sustain out
+    as if released and the new chords start at once.
+    """
+    for h, hand in enumerate(HANDS):
+        if prev_states[hand]:
+            change_hand(old, h, prev_states[hand], 0)
+            change_hand(new, h, 0, prev_states[hand])
+
+def swap_mapping(mapping):
+    """Install a newly compiled mapping (called from the watcher thread)"""
+    global active_mapping
+    if isinstance(synth, SamplePiano):
+        synth.bank.preload_async(mapping.all_notes())  # New key: resample in the background
+    active_mapping = mapping
+
+# Pre-rendered fallback sounds (used when no MIDI device is available)
+FALLBACK_DURATION = 0.3
+sound_bank = SoundBank(max_sounds=64, duration=FALLBACK_DURATION)
+
+# Cached HUD: static panel pre-rendered once, dynamic text re-rendered on change
+hud = HudOverlay(top=10, bottom=150, margin=10, alpha=0.7)
+
+def hud_panel_lines():
+    """Instruction panel contents as (text, org, scale, color, thickness) tuples"""
+    if SYNTH_ACTIVE:
+        status = ("Audio: Built-in synth", (20, 60), 0.5, (0, 255, 0), 1)
+    elif MIDI_AVAILABLE:
+        status = ("MIDI Audio: ON", (20, 60), 0.5, (0, 255, 0), 1)
     else:
-        cv2.putText(img, "MIDI Audio: OFF (Install loopMIDI for sound)", (20, 60), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
+        status = ("MIDI Audio: OFF (Install loopMIDI for sound)", (20, 60), 0.5, (0, 0, 255), 1)
+    scale_line, first_line, second_line = active_mapping.panel_lines
+    return (
+        ("Air-Piano - Hand Gesture MIDI Controller", (20, 35), 0.7, (255, 255, 255), 2),
+        status,
+        (scale_line, (20, 85), 0.5, (255, 255, 255), 1),
+        (first_line, (20, 105), 0.5, (255, 255, 255), 1),
+        (second_line, (20, 125), 0.5, (255, 255, 255), 1),
+    )
+
+def draw_instructions(img, stats_text=None, playing=None):
+    """Draw instructions and status on the image.
+
+    playing: snapshot of current_chords to show (defaults to the live list).
+    """
+    height = img.shape[0]
+    playing = current_chords if playing is None else playing
     
-    cv2.putText(img, "Raise fingers to play chords in D Major scale", (20, 85), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-    cv2.putText(img, "Thumb=D Major, Index=E Minor, Middle=F# Minor", (20, 105), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-    cv2.putText(img, "Ring=G Major, Pinky=A Major | Press 'q' to quit", (20, 125), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+    # Semi-transparent instruction panel (blended from the cached layer)
+    hud.draw_panel(img, hud_panel_lines())
     
     # Currently playing chords
-    if current_chords:
-        y_start = height - 60
-        cv2.putText(img, f"Playing: {', '.join(current_chords)}", (20, y_start), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+    if playing:
+        hud.draw_text(img, "chords", f"Playing: {', '.join(dict.fromkeys(playing))}",
+                      (20, height - 60), 0.6, (0, 255, 255), 2)
+    
+    # Pipeline statistics (frame age, dropped frames)
+    if stats_text:
+        hud.draw_text(img, "stats", stats_text, (20, height - 25), 0.5, (200, 200, 200), 1)
 
-def main():
-    global prev_states, current_chords, cap, detector
+def draw_timing_overlay(img, lines):
+    """Draw per-stage p50/p95/p99 lines below the instruction panel"""
+    if not lines:
+        return
+    hud.draw_text(img, "timing_header", "Stage ms           p50    p95    p99", (20, 175), 0.45, (0, 255, 255), 1)
+    for i, line in enumerate(lines):
+        hud.draw_text(img, f"timing_{i}", line, (20, 195 + 18 * i), 0.45, (200, 200, 200), 1)
+
+# 🎹 Turn one frame of detected hands into chord on/off events
+def update_chords(landmarks, handedness):
+    global prev_states, playing_mapping
+    
+    t = timing.mark()
+    mapping = active_mapping  # One read per frame; a reload swaps the whole table
+    if mapping is not playing_mapping:
+        retune_held(playing_mapping, mapping)
+        playing_mapping = mapping
+    if len(handedness):
+        masks = HandDetector.fingerMasks(landmarks, handedness)
+        t = timing.lap("fingersUp", t)
+        for code, mask in zip(handedness, masks):
+            h = 0 if code == HAND_LEFT else 1
+            hand_type = HANDS[h]
+            mask = int(mask)
+            if mask != prev_states[hand_type]:
+                change_hand(mapping, h, prev_states[hand_type], mask)
+                prev_states[hand_type] = mask  # Update state
+    else:
+        # If no hands detected, stop all chords after delay
+        for h, hand in enumerate(HANDS):
+            if prev_states[hand]:  # Only if it was playing
+                change_hand(mapping, h, prev_states[hand], 0)
+        prev_states = {hand: 0 for hand in HANDS}
+    
+    t = timing.lap("chord dispatch", t)
+    
+    # Send every note event from this frame in one timestamped batch
+    if MIDI_AVAILABLE:
+        midi_out.flush()
+        timing.lap("MIDI emit", t)
+
+def replay_landmarks(path, realtime=False, mode=CHORD_MODE_FINGERS, mapping_path=None):
+    """Feed a landmark recording straight into the chord logic, skipping MediaPipe"""
+    global chord_mode
+    chord_mode = mode
+    if mapping_path:
+        swap_mapping(load_mapping(mapping_path))
+    recording = LandmarkRecording(path)
+    startup = Startup()
+    add_audio_tasks(startup)
+    startup.start().wait()
+    print(f"🔁 Replaying {len(recording)} frames from {path}")
+    
+    start_time = time.perf_counter()
+    for timestamp, landmarks, handedness in recording.frames():
+        if realtime:
+            delay = timestamp - (time.perf_counter() - start_time)
+            if delay > 0:
+                time.sleep(delay)
+        update_chords(landmarks, handedness)
+    # Release anything still held at the end
+    update_chords(np.zeros((0, NUM_LANDMARKS, 2), dtype=np.int32), np.zeros(0, dtype=np.uint8))
+    note_scheduler.stop()
+    
+    elapsed = time.perf_counter() - start_time
+    if elapsed > 0:
+        print(f"📊 Replayed {len(recording)} frames in {elapsed:.2f}s "
+              f"({len(recording) / elapsed:.0f} FPS)")
+
+def main(source=None, pipelined=False, record_path=None, roi=False, inference_width=None,
+         keyframe_interval=1, display=DISPLAY_WINDOW, preview_fps=10, detection_workers=0,
+         timing_overlay=False, timing_dump=None, timing_interval=5.0, exit_after_startup=False,
+         mode=CHORD_MODE_FINGERS, mapping_path=None, record_midi=None):
+    """Run the Air-Piano loop.
+
+    source: a FrameSource to read from, or a function that opens one (called
+        on a startup thread); defaults to the first webcam.
+    pipelined: capture on a background thread, always detecting the newest frame.
+    record_path: stream detected landmarks to this file for later replay.
+    roi: run hand inference on a crop around the tracked hands.
+    inference_width: downscale frames to this width (or "auto") before inference.
+    keyframe_interval: run MediaPipe every N frames, optical flow in between.
+    display: DISPLAY_WINDOW draws and shows every frame; DISPLAY_HEADLESS skips
+        all drawing and window calls; DISPLAY_PREVIEW shows a preview_fps
+        snapshot rendered on a separate thread.
+    detection_workers: run HandDetector in this many worker processes fed
+        through shared memory (0 = detect in this process).
+    timing_overlay: time every stage and show p50/p95/p99 on screen.
+    timing_dump: time every stage and write the histograms to this .json
+        or .csv file every timing_interval seconds and on exit.
+    exit_after_startup: shut down as soon as the first frame has been read
+        (for launch-time measurements).
+    mode: CHORD_MODE_FINGERS plays one chord per raised finger;
+        CHORD_MODE_COMBO looks each hand's finger combination up in its
+        32-entry chord table.
+    mapping_path: JSON chord mapping to play (see chord_mapping.py); it is
+        reloaded whenever the file changes, without pausing the loop.
+    record_midi: save every note played to this .mid file, written by a
+        background thread about once a second.
+    """
+    global current_chords, cap, detector, chord_mode
+    chord_mode = mode
+    watcher = None
+    if mapping_path:
+        try:
+            swap_mapping(load_mapping(mapping_path))
+            print(f"🎼 Chord mapping: {active_mapping.key} {active_mapping.scale_name} from {mapping_path}")
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Using the built-in D Major mapping: {e}")
+        watcher = MappingWatcher(mapping_path, swap_mapping).start()
+    
+    # Open the camera, build the MediaPipe graph and start audio all at once
+    startup = Startup()
+    if source is None or callable(source):
+        startup.add("frame source", source or (lambda: CameraSource(0)))
+    # With worker processes the parent only draws and records, so it skips the MediaPipe graph
+    startup.add("hand detector", lambda: HandDetector(
+        detectionCon=0.8, roi=roi, inference_width=inference_width, keyframe_interval=keyframe_interval,
+        detect=not detection_workers))
+    add_audio_tasks(startup)
+    startup.start()
+    if display == DISPLAY_WINDOW:
+        # Put the window up straight away and show progress while the tasks run
+        def show_progress(startup):
+            cv2.imshow(WINDOW_TITLE, draw_progress(startup, WINDOW_TITLE))
+            cv2.waitKey(1)
+        window_start = startup.now()
+        show_progress(startup)
+        startup.phase("window", window_start)
+        startup.wait(show_progress)
+    else:
+        startup.wait()
+    cap = startup.result("frame source") if "frame source" in startup.tasks else source
+    detector = startup.result("hand detector")
+    detector.timing = timing
+    
+    if inference_width is not None:
+        print(f"📐 Inference resolution: {inference_width}")
+    if keyframe_interval > 1:
+        print(f"🎯 Sparse detection: MediaPipe every {keyframe_interval} frames, optical flow in between")
+    if roi:
+        print(f"🔍 ROI detection enabled (full-frame scan every {detector.full_scan_interval} frames)")
+    if record_path:
+        detector.recorder = LandmarkRecorder(record_path)
+        print(f"⏺️ Recording landmarks to {record_path}")
+    session_recorder = None
+    if record_midi:
+        if midi_out is None:
+            print("⚠️ No MIDI output or synth, so there are no notes to record")
+        else:
+            session_recorder = SessionRecorder(record_midi).start()
+            midi_out.recorder = session_recorder
+            print(f"⏺️ Recording notes to {record_midi}")
+    
+    if not MIDI_AVAILABLE and SOUND_AVAILABLE:
+        prerender_start = startup.now()
+        if chord_mode == CHORD_MODE_COMBO:
+            sound_bank.prerender(notes for table in active_mapping.combo for notes in table.notes if notes)
+        else:
+            sound_bank.prerender(notes for notes in active_mapping.notes if notes)
+        startup.phase("prerender beeps", prerender_start)
     
     print("🎹 Air-Piano Started!")
     print("📋 Instructions:")
     print("   - Raise your fingers to play chords")
-    print("   - Each finger maps to a different chord in D Major scale")
-    print("   - Press 'q' to quit")
+    if chord_mode == CHORD_MODE_COMBO:
+        print("   - Each finger combination maps to a chord: the lowest finger picks the triad,")
+        print("     each higher finger adds a 7th, 9th, 11th or 13th")
+    else:
+        print(f"   - Each finger maps to a different chord in {active_mapping.key} "
+              f"{active_mapping.scale_name.capitalize()} scale")
+    if display == DISPLAY_WINDOW:
+        print("   - Press 'q' to quit")
+    else:
+        print("   - Type 'q' + Enter or press Ctrl+C to quit")
     if not MIDI_AVAILABLE:
         print("💡 For audio output, download and install loopMIDI:")
         print("   https://www.tobias-erichsen.de/software/loopmidi.html")
 
-    while True:
-        success, img = cap.read()
-        if not success:
-            print("❌ Camera not capturing frames")
-            continue
+    # Ctrl+C / SIGTERM (and 'q' on stdin without a window) end the loop cleanly
+    stop_event = threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda signum, frame: stop_event.set())
+    if display != DISPLAY_WINDOW and not watch_stdin_for_quit(stop_event):
+        print("⚠️ No console input in this build: stop with Ctrl+C, SIGTERM or by ending the process")
+    preview = None
+    if display == DISPLAY_HEADLESS:
+        print("🕶️ Headless mode: no preview window")
+    elif display == DISPLAY_PREVIEW:
+        preview = PreviewRenderer(detector, stop_event, fps=preview_fps).start()
+        print(f"🖼️ Preview rendered off the hot path at up to {preview_fps} FPS")
+
+    grabber = None
+    if pipelined:
+        # Keep the driver queue short; the grabber thread drops stale frames
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        grabber = LatestFrameGrabber(cap).start()
+        print("⚡ Pipelined capture enabled (latest frame wins)")
 
-        # Flip image horizontally for mirror effect
-        img = cv2.flip(img, 1)
+    timing.enabled = timing_overlay or bool(timing_dump)
+    timing.dump_path = timing_dump
+    timing.dump_interval = timing_interval
+    timing_lines = []
+    if timing_dump:
+        print(f"⏱️ Stage timings -> {timing_dump} every {timing_interval:g}s")
+
+    pipeline = None
+    if detection_workers:
+        print(f"🧵 Hand detection in {detection_workers} worker process(es) via shared memory")
+
+    def handle_frame(img, landmarks, handedness, stats_text):
+        """Trigger chords for one detected frame and show it; False means quit"""
+        if pipeline is not None and detector.recorder is not None:
+            detector.recorder.write_frame(landmarks, handedness)
+        update_chords(landmarks, handedness)
         
-        hands, img = detector.findHands(img, draw=True)
-
-        if hands:
-            for hand in hands:
-                hand_type = "left" if hand["type"] == "Left" else "right"
-                fingers = detector.fingersUp(hand)
-                finger_names = ["thumb", "index", "middle", "ring", "pinky"]
-
-                for i, finger in enumerate(finger_names):
-                    if finger in chords[hand_type]:  # Only check assigned chords
-                        if fingers[i] == 1 and prev_states[hand_type][finger] == 0:
-                            chord_name = chord_names[hand_type][finger]
-                            play_chord(chords[hand_type][finger], chord_name)
-                            
-                            # Fallback beep if no MIDI
-                            if not MIDI_AVAILABLE and SOUND_AVAILABLE:
-                                # Different frequencies for different chords
-                                frequencies = {"thumb": 262, "index": 294, "middle": 330, "ring": 349, "pinky": 392}
-                                generate_beep(frequencies.get(finger, 440), 0.3)
-                                
-                        elif fingers[i] == 0 and prev_states[hand_type][finger] == 1:
-                            chord_name = chord_names[hand_type][finger]
-                            threading.Thread(target=stop_chord_after_delay, 
-                                           args=(chords[hand_type][finger], chord_name), 
-                                           daemon=True).start()
-                        prev_states[hand_type][finger] = fingers[i]  # Update state
-        else:
-            # If no hands detected, stop all chords after delay
-            for hand in chords:
-                for finger in chords[hand]:
-                    if prev_states[hand][finger] == 1:  # Only if it was playing
-                        chord_name = chord_names[hand][finger]
-                        threading.Thread(target=stop_chord_after_delay, 
-                                       args=(chords[hand][finger], chord_name), 
-                                       daemon=True).start()
-            prev_states = {hand: {finger: 0 for finger in chords[hand]} for hand in chords}        # Draw instructions and status
-        draw_instructions(img)
+        if display == DISPLAY_WINDOW:
+            if pipeline is not None:
+                detector.drawLandmarks(img, landmarks)  # Workers never draw
+            # Draw instructions and status
+            with timing.stage("draw_instructions"):
+                draw_instructions(img, stats_text)
+                if timing_overlay:
+                    draw_timing_overlay(img, timing_lines)
+            
+            with timing.stage("imshow"):
+                cv2.imshow(WINDOW_TITLE, img)
+                key = cv2.waitKey(1)
+            if key & 0xFF == ord('q'):
+                return False
+        elif preview is not None:
+            # Shared-memory slots are reused, so the preview gets its own copy
+            preview.submit(img.copy() if pipeline is not None else img, landmarks, handedness, stats_text)
+        return True
+
+    frame_count = 0
+    age_total = 0.0
+    saved_total = 0.0
+    stats_text = None
+    processed_frames = 0
+    start_time = time.perf_counter()
+    loop_start = startup.now()
+
+    try:
+        while not stop_event.is_set():
+            with timing.stage("cap.read"):
+                if grabber is not None:
+                    success, img, captured_at = grabber.read()
+                else:
+                    success, img = cap.read()
+            if not success:
+                if getattr(cap, "finished", False):
+                    print("🏁 Frame source finished")
+                    break
+                print("❌ Camera not capturing frames")
+                continue
+            processed_frames += 1
+            if processed_frames == 1:
+                startup.phase("first frame", loop_start)
+                print("🚀 Startup timing (seconds since main() started):")
+                for line in startup.report():
+                    print(line)
+                if exit_after_startup:
+                    break
+            if timing.enabled:
+                if timing_overlay and processed_frames % TIMING_OVERLAY_REFRESH == 0:
+                    timing_lines = timing.overlay_lines()
+                timing.maybe_dump()
+
+            stats = []
+            if grabber is not None:
+                # Capture-to-detect age of the frame about to be processed
+                frame_age = time.perf_counter() - captured_at
+                frame_count += 1
+                age_total += frame_age
+                stats.append(f"Frame age: {frame_age * 1000:.1f} ms | Dropped: {grabber.dropped}")
+                if frame_count % 100 == 0:
+                    print(f"⏱️ Avg frame age: {age_total / frame_count * 1000:.1f} ms, "
+                          f"dropped {grabber.dropped} of {grabber.seq} frames")
+
+            if detection_workers:
+                if pipeline is None:
+                    # The flip for the mirror effect writes straight into the shared slot
+                    pipeline = DetectionPipeline(
+                        img.shape, workers=detection_workers, transform=lambda src, dst: cv2.flip(src, 1, dst),
+                        detectionCon=0.8, roi=roi, inference_width=inference_width,
+                        keyframe_interval=keyframe_interval)
+                detected = [result[1:] for result in pipeline.process(img)]
+                fps, latency_ms, overhead_ms = pipeline.stats()
+                stats.append(f"Workers: {fps:.0f} FPS, {latency_ms:.1f} ms (+{overhead_ms:.1f} ms)")
+                stats_text = " | ".join(stats)
+                if not all(handle_frame(*frame, stats_text) for frame in detected):
+                    break
+                continue
+
+            # Flip image horizontally for mirror effect
+            with timing.stage("flip"):
+                img = cv2.flip(img, 1)
         
-        cv2.imshow("Air-Piano - Hand Gesture MIDI Controller", img)
+            landmarks, handedness, img = detector.findHandsArray(img, draw=display == DISPLAY_WINDOW)
         
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+            if roi:
+                saved_total += detector.inference_saved_ms
+                stats.append(f"Inference: {detector.process_ms:.1f} ms (saved {detector.inference_saved_ms:.1f} ms)")
+                if processed_frames % 100 == 0:
+                    print(f"🔍 ROI saved {saved_total / processed_frames:.1f} ms of inference per frame on average")
+            if detector.auto_resolution:
+                stats.append(f"Input width: {detector.inference_width}px")
+            if keyframe_interval > 1:
+                stats.append("Optical flow" if detector.tracked else "Keyframe")
+            stats_text = " | ".join(stats) or None
+
+            if not handle_frame(img, landmarks, handedness, stats_text):
+                break
 
+        if pipeline is not None:
+            for _, img, landmarks, handedness in pipeline.drain():
+                handle_frame(img, landmarks, handedness, stats_text)
+            fps, latency_ms, overhead_ms = pipeline.stats()
+            print(f"🧵 Detection pipeline: {fps:.1f} FPS throughput, {latency_ms:.1f} ms submit-to-result "
+                  f"({overhead_ms:.1f} ms added by the pipeline)")
+    finally:
+        if pipeline is not None:
+            pipeline.close()  # Always unlink the shared memory, even after an error
+    if preview is not None:
+        preview.stop()
+        print(f"🖼️ Preview rendered {preview.rendered} of {processed_frames} frames")
+    if grabber is not None:
+        grabber.stop()
     cap.release()
-    cv2.destroyAllWindows()
+    if watcher is not None:
+        watcher.stop()
+    # Release anything still held, then send pending note-offs before MIDI shuts down
+    update_chords(np.zeros((0, NUM_LANDMARKS, 2), dtype=np.int32), np.zeros(0, dtype=np.uint8))
+    note_scheduler.stop()
+    if session_recorder is not None:
+        midi_out.recorder = None
+        session_recorder.stop()
+        print(f"💾 Saved {session_recorder.events_written} note events to {record_midi}")
+    if detector.recorder is not None:
+        detector.recorder.close()
+        detector.recorder = None
+    if timing.enabled:
+        print("⏱️ Stage timings (ms)        p50      p95      p99")
+        for name, entry in timing.summary().items():
+            if entry["count"]:
+                print(f"   {name:<22}{entry['p50_ms']:9.3f}{entry['p95_ms']:9.3f}{entry['p99_ms']:9.3f}")
+        if timing_dump:
+            timing.dump()
+    
+    elapsed = time.perf_counter() - start_time
+    if elapsed > 0:
+        print(f"📊 Processed {processed_frames} frames in {elapsed:.1f}s "
+              f"({processed_frames / elapsed:.1f} FPS)")
+    if display != DISPLAY_HEADLESS:
+        cv2.destroyAllWindows()
     
     if MIDI_AVAILABLE:
         try:
+            midi_out.close()
             pygame.midi.quit()
         except:
             pass
@@ -309,4 +828,65 @@ def main():
     print("🎹 Air-Piano Stopped!")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    import multiprocessing
+    multiprocessing.freeze_support()  # Detection workers in a frozen executable
+
+    parser = argparse.ArgumentParser(description="Air-Piano - Hand Gesture MIDI Controller")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="capture frames on a background thread and always detect on the newest one")
+    parser.add_argument("--source", default="camera:0",
+                        help="camera[:index], video:<path>, images:<dir> or synthetic[:WxH]")
+    parser.add_argument("--pacing", choices=[PACING_REALTIME, PACING_FAST], default=PACING_REALTIME,
+                        help="play recorded/synthetic sources in real time or as fast as possible")
+    parser.add_argument("--no-loop", action="store_true",
+                        help="stop at the end of a video or image directory instead of looping")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record detected hand landmarks to a binary file")
+    parser.add_argument("--record-midi", metavar="PATH",
+                        help="save the notes played to a .mid file (written in the background)")
+    parser.add_argument("--roi", action="store_true",
+                        help="run hand detection on a crop around the tracked hands")
+    parser.add_argument("--inference-width", metavar="PIXELS|auto",
+                        help="downscale frames to this width before hand detection, or 'auto' to fit the frame budget")
+    parser.add_argument("--keyframe-interval", type=int, default=1, metavar="N",
+                        help="run hand detection every N frames and track landmarks with optical flow in between")
+    display_group = parser.add_mutually_exclusive_group()
+    display_group.add_argument("--headless", action="store_true",
+                               help="run without a window; quit with 'q' + Enter or Ctrl+C")
+    display_group.add_argument("--preview-fps", type=float, metavar="FPS",
+                               help="show a preview at this rate, rendered on a separate thread")
+    parser.add_argument("--workers", type=int, default=0, metavar="N",
+                        help="run hand detection in N worker processes fed through shared memory")
+    parser.add_argument("--timing", action="store_true",
+                        help="time every stage of the frame loop and show p50/p95/p99 on screen")
+    parser.add_argument("--timing-dump", metavar="PATH",
+                        help="write per-stage latency histograms to a .json or .csv file periodically")
+    parser.add_argument("--timing-interval", type=float, default=5.0, metavar="SECONDS",
+                        help="seconds between --timing-dump writes (default 5)")
+    parser.add_argument("--exit-after-startup", action="store_true",
+                        help="quit once the first frame has been read (used by measure_launch.py)")
+    parser.add_argument("--chord-mode", choices=[CHORD_MODE_FINGERS, CHORD_MODE_COMBO], default=CHORD_MODE_FINGERS,
+                        help="one chord per finger, or one chord per finger combination (32 per hand)")
+    parser.add_argument("--mapping", metavar="PATH",
+                        help=f"JSON chord mapping, reloaded when it changes (default: {DEFAULT_MAPPING_PATH} if present)")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="replay a landmark recording through the chord logic (no camera, no MediaPipe)")
+    args = parser.parse_args()
+    mapping_path = args.mapping or (DEFAULT_MAPPING_PATH if os.path.exists(DEFAULT_MAPPING_PATH) else None)
+    if args.replay:
+        replay_landmarks(args.replay, realtime=args.pacing == PACING_REALTIME, mode=args.chord_mode,
+                         mapping_path=mapping_path)
+    else:
+        # Opened on a startup thread alongside MediaPipe and audio
+        main(source=lambda: open_frame_source(args.source, pacing=args.pacing, loop=not args.no_loop),
+             pipelined=args.pipelined, record_path=args.record, roi=args.roi,
+             inference_width=args.inference_width if args.inference_width in (None, "auto")
+             else int(args.inference_width),
+             keyframe_interval=args.keyframe_interval,
+             display=DISPLAY_HEADLESS if args.headless
+             else DISPLAY_PREVIEW if args.preview_fps else DISPLAY_WINDOW,
+             preview_fps=args.preview_fps or 10, detection_workers=args.workers,
+             timing_overlay=args.timing, timing_dump=args.timing_dump,
+             timing_interval=args.timing_interval, exit_after_startup=args.exit_after_startup,
+             mode=args.chord_mode, mapping_path=mapping_path, record_midi=args.record_midi)
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Headless benchmark suite for Air-Piano
+Runs on Linux without a webcam, MIDI port or audio device, using generated
+(or recorded) frames and landmark streams, and stores the results as JSON
+so later runs can be compared against a baseline.
+
+    python benchmark.py --output results.json
+    python benchmark.py --baseline baseline.json --threshold 0.15
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+import numpy as np
+
+from frame_sources import open_frame_source, PACING_FAST
+from landmark_recording import LandmarkRecording, HAND_LEFT, HAND_RIGHT, NUM_LANDMARKS
+from midi_output import MemoryMidiBackend, MidiOutput, NOTE_ON
+from tone_bank import render_tone
+from soft_synth import SoftSynth
+from chord_mapping import CHORD_MODE_FINGERS, CHORD_MODE_COMBO
+
+RESULTS_VERSION = 1
+
+
+def best_time(fn, repeats=5):
+    """Fastest of `repeats` calls to fn(), in seconds"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def metric(value, unit, higher_is_better):
+    return {"value": float(value), "unit": unit, "higher_is_better": higher_is_better}
+
+
+# --- Inputs ---
+
+def synthetic_hand(mask, code, origin):
+    """21 pixel landmarks for one hand whose raised fingers match the 5-bit mask"""
+    x0, y0 = origin
+    hand = np.zeros((NUM_LANDMARKS, 2), dtype=np.int32)
+    for i in range(NUM_LANDMARKS):
+        hand[i] = (x0 + 12 * (i // 4), y0 - 10 * (i % 4))  # Rough fan of points
+    # Thumb compares x (mirrored for the right hand); fingers compare y
+    thumb_up = bool(mask & 1)
+    pip_x = x0 + 40
+    toward = -20 if (code == HAND_LEFT) == thumb_up else 20
+    hand[3] = (pip_x, y0 - 40)
+    hand[4] = (pip_x + toward, y0 - 50)
+    for bit, (tip, pip) in enumerate(zip((8, 12, 16, 20), (6, 10, 14, 18)), start=1):
+        x = x0 + 25 * bit
+        hand[pip] = (x, y0 - 100)
+        hand[tip] = (x, y0 - 150 if mask & (1 << bit) else y0 - 50)
+    return hand
+
+
+def synthetic_landmark_stream(frames=3000, hold=6, seed=0):
+    """(landmarks (T, 2, 21, 2), handedness (2,), masks (T, 2)) for a left and a right hand.
+
+    Each hand switches to a random finger mask every `hold` frames.
+    """
+    rng = np.random.default_rng(seed)
+    changes = rng.integers(0, 32, size=(frames // hold + 1, 2))
+    masks = np.repeat(changes, hold, axis=0)[:frames]
+    handedness = np.array([HAND_LEFT, HAND_RIGHT], dtype=np.uint8)
+    landmarks = np.empty((frames, 2, NUM_LANDMARKS, 2), dtype=np.int32)
+    for t in range(frames):
+        for h, code in enumerate(handedness):
+            landmarks[t, h] = synthetic_hand(int(masks[t, h]), code, (150 + 300 * h, 400))
+    return landmarks, handedness, masks
+
+
+def recorded_landmark_stream(path):
+    """Frames of a landmark recording as lists of (landmarks, handedness) copies"""
+    return [(landmarks.astype(np.int32), hands.copy())
+            for _, landmarks, hands in LandmarkRecording(path).frames()]
+
+
+def load_frames(spec, count):
+    source = open_frame_source(spec, pacing=PACING_FAST, loop=True)
+    frames = []
+    while len(frames) < count:
+        success, img = source.read()
+        if not success:
+            if getattr(source, "finished", False):
+                break
+            continue
+        frames.append(img)
+    source.release()
+    return frames
+
+
+# --- Benchmarks ---
+
+def bench_detector(frames, repeats):
+    """HandDetector.findHands / findHandsArray throughput in frames/sec"""
+    from hand_detector import HandDetector
+    detector = HandDetector(detectionCon=0.8)
+    for img in frames[:10]:
+        detector.findHandsArray(img.copy(), draw=False)  # Model warm-up
+    copies = [img.copy() for img in frames]
+
+    def run_dicts():
+        for img in copies:
+            detector.findHands(img, draw=False)
+
+    def run_arrays():
+        for img in copies:
+            detector.findHandsArray(img, draw=False)
+
+    return {
+        "detector_findHands_fps": metric(len(frames) / best_time(run_dicts, repeats), "frames/s", True),
+        "detector_findHandsArray_fps": metric(len(frames) / best_time(run_arrays, repeats), "frames/s", True),
+    }
+
+
+def bench_finger_masks(landmarks, handedness, masks, repeats):
+    """Vectorized fingerMasks and per-hand fingersUp evaluations per second"""
+    from hand_detector import HandDetector
+    from landmark_recording import HAND_LABELS
+    frames, hands = landmarks.shape[:2]
+    flat = landmarks.reshape(-1, NUM_LANDMARKS, 2)
+    flat_hands = np.tile(handedness, frames)
+    computed = HandDetector.fingerMasks(flat, flat_hands).reshape(frames, hands)
+    if not np.array_equal(computed, masks):
+        raise AssertionError("Synthetic landmarks do not reproduce their finger masks")
+
+    hand_dicts = [{"type": HAND_LABELS[int(code)], "landmarks": lm.tolist()}
+                  for lm, code in zip(flat[:2000], flat_hands[:2000])]
+
+    def run_compat():
+        for hand in hand_dicts:
+            HandDetector.fingersUp(hand)
+
+    def run_frames():
+        for t in range(frames):
+            HandDetector.fingerMasks(landmarks[t], handedness)
+
+    batch = best_time(lambda: HandDetector.fingerMasks(flat, flat_hands), repeats)
+    return {
+        "fingerMasks_batch_evals_per_s": metric(len(flat) / batch, "hands/s", True),
+        "fingerMasks_per_frame_evals_per_s": metric(len(flat) / best_time(run_frames, repeats), "hands/s", True),
+        "fingersUp_evals_per_s": metric(len(hand_dicts) / best_time(run_compat, repeats), "hands/s", True),
+    }
+
+
+class TimestampedMemoryBackend(MemoryMidiBackend):
+    """MemoryMidiBackend that also records when each batch was written"""
+    def __init__(self):
+        super().__init__()
+        self.write_times = []
+
+    def write(self, events):
+        self.write_times.append(time.perf_counter())
+        super().write(events)
+
+
+def prepare_app():
+    """Import the app (which opens no devices) and route its MIDI into memory"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        import air_piano_main as app
+    app.midi_out = MidiOutput(TimestampedMemoryBackend())
+    app.MIDI_AVAILABLE = True
+    app.SYNTH_ACTIVE = False
+    app.SOUND_AVAILABLE = False
+    return app
+
+
+def reset_app(app):
+    app.note_scheduler.stop(run_pending=False)
+    app.note_scheduler = app.NoteScheduler()
+    app.voices.release_all()
+    app.prev_states = {hand: 0 for hand in app.HANDS}
+    app.current_chords.clear()
+    app.midi_out = MidiOutput(TimestampedMemoryBackend())
+
+
+def bench_chord_dispatch(app, stream, repeats):
+    """Finger transitions pushed through update_chords per second"""
+    transitions = 0
+    previous = {}
+    for landmarks, handedness in stream:
+        masks = app.HandDetector.fingerMasks(landmarks, handedness) if len(handedness) else []
+        current = {int(code): int(mask) for code, mask in zip(handedness, masks)}
+        for code in set(previous) | set(current):
+            transitions += bin(previous.get(code, 0) ^ current.get(code, 0)).count("1")
+        previous = current
+
+    def run():
+        reset_app(app)
+        for landmarks, handedness in stream:
+            app.update_chords(landmarks, handedness)
+
+    with contextlib.redirect_stdout(io.StringIO()):  # Chord prints would time the terminal
+        elapsed = best_time(run, repeats)
+        reset_app(app)
+    return {
+        "chord_dispatch_events_per_s": metric(transitions / elapsed, "transitions/s", True),
+        "chord_dispatch_frame_us": metric(elapsed / len(stream) * 1e6, "us/frame", False),
+    }
+
+
+def bench_gesture_to_note(app, samples=300):
+    """Latency from landmarks entering update_chords to the note-on batch write"""
+    handedness = np.array([HAND_LEFT, HAND_RIGHT], dtype=np.uint8)
+    down = np.stack([synthetic_hand(0, code, (150 + 300 * h, 400)) for h, code in enumerate(handedness)])
+    saved_sustain = app.SUSTAIN_TIME
+    app.SUSTAIN_TIME = 0.0  # Release at once so every press starts new notes
+    latencies = []
+    rng = np.random.default_rng(1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        reset_app(app)
+        backend = app.midi_out.backend
+        for _ in range(samples):
+            masks = rng.integers(1, 32, size=2)
+            up = np.stack([synthetic_hand(int(m), code, (150 + 300 * h, 400))
+                           for h, (m, code) in enumerate(zip(masks, handedness))])
+            writes = len(backend.write_times)
+            start = time.perf_counter()
+            app.update_chords(up, handedness)
+            new = [(t, batch) for t, batch in zip(backend.write_times[writes:], backend.batches[writes:])
+                   if any(status & 0xF0 == NOTE_ON for (status, _, _), _ in batch)]
+            if new:
+                latencies.append(new[0][0] - start)
+            app.update_chords(down, handedness)
+            while len(app.note_scheduler):  # Let the note-offs go out before the next press
+                time.sleep(0.0005)
+        reset_app(app)
+    app.SUSTAIN_TIME = saved_sustain
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, (50, 95, 99))
+    return {
+        "gesture_to_note_p50_ms": metric(p50, "ms", False),
+        "gesture_to_note_p95_ms": metric(p95, "ms", False),
+        "gesture_to_note_p99_ms": metric(p99, "ms", False),
+    }
+
+
+def bench_gesture_engine(landmarks, handedness, repeats):
+    """Whole-batch landmarks -> note events through GestureEngine"""
+    from gesture_engine import GestureEngine
+    timestamps = np.arange(len(landmarks)) / 30.0
+    results = {}
+    for mode in (CHORD_MODE_FINGERS, CHORD_MODE_COMBO):
+        engine = GestureEngine(mode=mode)
+        elapsed = best_time(lambda: engine.events(timestamps, landmarks, handedness), repeats)
+        results[f"gesture_engine_{mode}_frames_per_s"] = metric(len(landmarks) / elapsed, "frames/s", True)
+    return results
+
+
+def bench_audio(repeats):
+    """Fallback tone rendering (tone_bank.render_tone) and built-in synth block rendering"""
+    tone = best_time(lambda: render_tone([440.0], 0.3), repeats)
+    chord = best_time(lambda: render_tone([293.66, 369.99, 440.0], 0.3), repeats)
+
+    synth = SoftSynth()
+    for note in (50, 54, 57, 62, 66, 69, 74, 78, 81, 64, 67, 71):
+        synth.note_on(note)
+    blocks = 200
+    render = best_time(lambda: [synth.render(synth.block_size) for _ in range(blocks)], repeats) / blocks
+    block_s = synth.block_size / synth.sample_rate
+    return {
+        "tone_render_ms": metric(tone * 1000, "ms", False),
+        "chord_tone_render_ms": metric(chord * 1000, "ms", False),
+        "synth_block_render_us": metric(render * 1e6, "us/block", False),
+        "synth_realtime_factor": metric(block_s / render, "x realtime", True),
+    }
+
+
+# --- Results ---
+
+def environment():
+    import cv2
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "numpy": np.__version__, "opencv": cv2.__version__}
+
+
+def compare(results, baseline, threshold):
+    """Print each metric against the baseline; returns the names that regressed"""
+    regressions = []
+    print(f"{'metric':<36}{'baseline':>14}{'current':>14}{'change':>9}")
+    for name, current in results["metrics"].items():
+        base = baseline.get("metrics", {}).get(name)
+        if base is None or not base["value"]:
+            print(f"{name:<36}{'-':>14}{current['value']:>14.4g}")
+            continue
+        change = (current["value"] - base["value"]) / base["value"]
+        worse = -change if current["higher_is_better"] else change
+        flag = ""
+        if worse > threshold:
+            regressions.append(name)
+            flag = "  ❌ regression"
+        print(f"{name:<36}{base['value']:>14.4g}{current['value']:>14.4g}{change:>+9.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Air-Piano headless benchmarks")
+    parser.add_argument("--frames", default="synthetic:640x480",
+                        help="frame source spec for the detector benchmark (see --source in air_piano_main.py)")
+    parser.add_argument("--frame-count", type=int, default=120)
+    parser.add_argument("--landmarks", metavar="PATH",
+                        help="landmark recording to use for chord dispatch instead of a generated stream")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per benchmark; the fastest counts")
+    parser.add_argument("--skip-detector", action="store_true", help="skip the MediaPipe benchmark")
+    parser.add_argument("--output", metavar="PATH", help="write results to this JSON file")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a previous results file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="fractional slowdown that counts as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    metrics = {}
+    landmarks, handedness, masks = synthetic_landmark_stream()
+
+    print("⏱️ Finger masks...")
+    metrics.update(bench_finger_masks(landmarks, handedness, masks, args.repeats))
+
+    print("⏱️ Batch gesture engine...")
+    metrics.update(bench_gesture_engine(landmarks, handedness, args.repeats))
+
+    print("⏱️ Audio rendering...")
+    metrics.update(bench_audio(args.repeats))
+
+    print("⏱️ Chord dispatch and gesture-to-note latency...")
+    app = prepare_app()
+    if args.landmarks:
+        stream = recorded_landmark_stream(args.landmarks)
+    else:
+        stream = [(landmarks[t], handedness) for t in range(len(landmarks))]
+    metrics.update(bench_chord_dispatch(app, stream, args.repeats))
+    metrics.update(bench_gesture_to_note(app))
+
+    if not args.skip_detector:
+        print(f"⏱️ Hand detector on {args.frame_count} frames from {args.frames}...")
+        try:
+            frames = load_frames(args.frames, args.frame_count)
+            metrics.update(bench_detector(frames, max(1, args.repeats // 2)))
+        except (ImportError, AttributeError) as e:
+            print(f"⚠️ Skipping detector benchmark: {e}")
+
+    app.note_scheduler.stop(run_pending=False)
+    results = {"version": RESULTS_VERSION, "timestamp": time.time(),
+               "environment": environment(), "metrics": metrics}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+            return 1
+        print("✅ No regressions")
+    else:
+        for name, m in metrics.items():
+            print(f"   {name:<36}{m['value']:>14.4g} {m['unit']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
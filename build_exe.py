@@ -2,6 +2,9 @@
 """
 Build script for Air-Piano executable
 This script creates an executable (.exe) file from the Air-Piano Python application
+
+    python build_exe.py          # single-file executable (extracts itself on every launch)
+    python build_exe.py --fast   # pruned onedir build from air_piano_fast.spec (fast startup)
 """
 
 import os
@@ -9,8 +12,10 @@ import sys
 import subprocess
 import shutil
 
-def main():
-    print("🔨 Building Air-Piano Executable")
+EXE_NAME = "Air-Piano.exe" if sys.platform == "win32" else "Air-Piano"
+
+def main(fast=False):
+    print("🔨 Building Air-Piano Executable" + (" (fast-start onedir)" if fast else ""))
     print("=" * 50)
     
     # Check if PyInstaller is installed
@@ -30,14 +35,14 @@ def main():
     if os.path.exists("dist"):
         shutil.rmtree("dist")
         print("🧹 Cleaned dist directory")
-      # Build command
+    # Build command
     build_cmd = [
         sys.executable, "-m", "PyInstaller",
         "--onefile",                    # Create single executable
         "--windowed",                   # Hide console window
         "--name=Air-Piano",             # Name of executable
         "--icon=piano.ico",             # Icon (if exists)
-        "--add-data=requirements.txt;.", # Include requirements
+        f"--add-data=requirements.txt{os.pathsep}.", # Include requirements
         "--hidden-import=cv2",          # Ensure OpenCV is included
         "--hidden-import=mediapipe",    # Ensure MediaPipe is included
         "--hidden-import=pygame",       # Ensure Pygame is included
@@ -46,8 +51,12 @@ def main():
         "--collect-all=cv2",            # Collect all OpenCV files
         "air_piano_main.py"
     ]
-      # Remove icon parameter if icon doesn't exist
-    if not os.path.exists("piano.ico"):
+    if fast:
+        # Unpacked layout with only the hand models and OpenCV pieces we use
+        build_cmd = [sys.executable, "-m", "PyInstaller", "--noconfirm", "air_piano_fast.spec"]
+    
+    # Remove icon parameter if icon doesn't exist
+    if not os.path.exists("piano.ico") and not fast:
         # Remove both the --icon flag and its value
         if "--icon=piano.ico" in build_cmd:
             build_cmd.remove("--icon=piano.ico")
@@ -61,22 +70,29 @@ def main():
         print("✅ Build completed successfully!")
         
         # Check if executable was created
-        exe_path = os.path.join("dist", "Air-Piano.exe")
+        if fast:
+            exe_path = os.path.join("dist", "Air-Piano", EXE_NAME)
+            size_bytes = sum(os.path.getsize(os.path.join(root, name))
+                             for root, _, names in os.walk(os.path.join("dist", "Air-Piano")) for name in names)
+        else:
+            exe_path = os.path.join("dist", EXE_NAME)
+            size_bytes = os.path.getsize(exe_path) if os.path.exists(exe_path) else 0
         if os.path.exists(exe_path):
-            size_mb = os.path.getsize(exe_path) / (1024 * 1024)
             print(f"📦 Executable created: {exe_path}")
-            print(f"📏 Size: {size_mb:.1f} MB")
+            print(f"📏 Size: {size_bytes / (1024 * 1024):.1f} MB")
+            print(f"⏱️ Measure launch time with: python measure_launch.py {exe_path}")
             
-            # Create a batch file for easy running
-            batch_content = f"""@echo off
+            if sys.platform == "win32":
+                # Create a batch file for easy running
+                batch_content = f"""@echo off
 echo Starting Air-Piano...
 echo Press 'q' in the camera window to quit
 "{exe_path}"
 pause
 """
-            with open("Run-Air-Piano.bat", "w") as f:
-                f.write(batch_content)
-            print("✅ Created Run-Air-Piano.bat for easy launching")
+                with open("Run-Air-Piano.bat", "w") as f:
+                    f.write(batch_content)
+                print("✅ Created Run-Air-Piano.bat for easy launching")
             
         else:
             print("❌ Executable not found in dist folder")
@@ -89,7 +105,7 @@ pause
     
     print("\n🎹 Air-Piano Build Complete!")
     print("📁 Files created:")
-    print("   - dist/Air-Piano.exe (main executable)")
+    print(f"   - {exe_path} (main executable)")
     print("   - Run-Air-Piano.bat (launcher script)")
     print("\n💡 To run: Double-click Run-Air-Piano.bat or Air-Piano.exe")
     print("🎯 Make sure your camera is connected and working!")
@@ -97,6 +113,6 @@ pause
     return True
 
 if __name__ == "__main__":
-    success = main()
+    success = main(fast="--fast" in sys.argv[1:])
     if not success:
         sys.exit(1)
@@ -0,0 +1,274 @@
+"""
+Loadable chord mappings for Air-Piano
+A JSON mapping file sets the key, scale, per-hand finger chords, velocities
+and MIDI channels. It is validated once and compiled into an immutable
+ChordMapping of flat tuples indexed by hand * 5 + finger, so the frame loop
+never parses anything. MappingWatcher recompiles the file when it changes
+and hands over the new table in a single reference swap.
+
+    {
+      "key": "D", "scale": "major", "octave": 4,
+      "velocity": 127, "channel": 0,
+      "hands": {
+        "left":  {"thumb": "I", "index": "ii", "middle": "iii", "ring": "IV", "pinky": "V"},
+        "right": {"thumb": 1, "index": [64, 67, 71],
+                  "middle": {"degree": 3, "velocity": 100}, "channel": 1}
+      }
+    }
+
+A finger chord is a scale degree (1-14 or a roman numeral) built as a
+triad in the key, a list of MIDI notes, or an object with "degree" or
+"notes" plus optional "name" and "velocity". Fingers left out play nothing.
+"""
+
+import json
+import os
+import threading
+from chord_table import ChordTable, MAJOR_SCALE, MAX_NOTE, NOTE_NAMES, diatonic_note, chord_name, combo_voicings
+
+HANDS = ("left", "right")
+FINGERS = ("thumb", "index", "middle", "ring", "pinky")
+FINGERS_PER_HAND = len(FINGERS)
+
+# Chord modes: one chord per finger, or one chord per finger combination
+CHORD_MODE_FINGERS = "fingers"
+CHORD_MODE_COMBO = "combo"
+
+SCALES = {
+    "major": MAJOR_SCALE,
+    "minor": (0, 2, 3, 5, 7, 8, 10),
+    "harmonic minor": (0, 2, 3, 5, 7, 8, 11),
+    "melodic minor": (0, 2, 3, 5, 7, 9, 11),
+    "dorian": (0, 2, 3, 5, 7, 9, 10),
+    "mixolydian": (0, 2, 4, 5, 7, 9, 10),
+}
+KEY_NAMES = {name: pc for pc, name in enumerate(NOTE_NAMES)}
+KEY_NAMES.update({"Db": 1, "Eb": 3, "Gb": 6, "Ab": 8, "Bb": 10})
+ROMAN_NUMERALS = ("i", "ii", "iii", "iv", "v", "vi", "vii")
+
+# The chords the app has always played: D major, thumb..pinky = I..V on both hands
+DEFAULT_MAPPING = {
+    "key": "D",
+    "scale": "major",
+    "octave": 4,
+    "velocity": 127,
+    "channel": 0,
+    "hands": {hand: dict(zip(FINGERS, ("I", "ii", "iii", "IV", "V"))) for hand in HANDS},
+}
+
+
+class ChordMapping:
+    """Compiled, read-only chord lookup tables.
+
+    notes, names and velocities are flat tuples indexed by
+    hand_index * FINGERS_PER_HAND + finger_index; channels and
+    hand_velocities are indexed by hand_index; combo holds one 32-entry
+    ChordTable per hand for finger-combination mode.
+    """
+    __slots__ = ("source", "key", "scale_name", "notes", "names", "velocities",
+                 "channels", "hand_velocities", "combo", "panel_lines")
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ChordMapping is read-only; compile a new one instead")
+
+    def chord(self, hand, finger):
+        """(notes, name, velocity, channel) of one finger, by name"""
+        h = HANDS.index(hand)
+        k = h * FINGERS_PER_HAND + FINGERS.index(finger)
+        return self.notes[k], self.names[k], self.velocities[k], self.channels[h]
+
+    def all_notes(self):
+        """Set of every MIDI note the mapping can play, in either chord mode"""
+        notes = {note for chord in self.notes for note in chord}
+        notes.update(note for table in self.combo for chord in table.notes for note in chord)
+        return notes
+
+
+def _check_int(value, low, high, where):
+    if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+        raise ValueError(f"{where}: expected an integer from {low} to {high}, got {value!r}")
+    return value
+
+
+def _parse_degree(value, scale, where):
+    """0-based scale degree from 1-based numbers or roman numerals (case ignored)"""
+    if isinstance(value, str):
+        numeral = value.strip().lower()
+        if numeral not in ROMAN_NUMERALS:
+            raise ValueError(f"{where}: unknown roman numeral {value!r}")
+        return ROMAN_NUMERALS.index(numeral)
+    return _check_int(value, 1, 2 * len(scale), where) - 1
+
+
+def _parse_chord(value, tonic, scale, where):
+    """(notes, name or None, velocity or None) for one finger entry"""
+    name = velocity = None
+    if isinstance(value, dict):
+        unknown = set(value) - {"degree", "notes", "name", "velocity"}
+        if unknown:
+            raise ValueError(f"{where}: unknown fields {sorted(unknown)}")
+        if ("degree" in value) == ("notes" in value):
+            raise ValueError(f"{where}: give exactly one of 'degree' or 'notes'")
+        name = value.get("name")
+        if name is not None and not isinstance(name, str):
+            raise ValueError(f"{where}.name: expected a string")
+        if "velocity" in value:
+            velocity = _check_int(value["velocity"], 1, 127, f"{where}.velocity")
+        value = value["degree"] if "degree" in value else value["notes"]
+    if isinstance(value, list):
+        if not value:
+            raise ValueError(f"{where}: empty note list")
+        notes = tuple(sorted({_check_int(note, 0, 127, f"{where}[{i}]") for i, note in enumerate(value)}))
+    else:
+        degree = _parse_degree(value, scale, where)
+        notes = tuple(diatonic_note(tonic, scale, degree + step) for step in (0, 2, 4))
+        if notes[-1] > 127:
+            raise ValueError(f"{where}: chord goes above MIDI note 127")
+    return notes, name, velocity
+
+
+def compile_mapping(spec, source="<built-in>"):
+    """Validate a mapping dict and compile it into a ChordMapping (ValueError if invalid)"""
+    if not isinstance(spec, dict):
+        raise ValueError("mapping: expected a JSON object")
+    unknown = set(spec) - {"key", "scale", "octave", "velocity", "channel", "hands"}
+    if unknown:
+        raise ValueError(f"mapping: unknown fields {sorted(unknown)}")
+
+    key = spec.get("key", "D")
+    if key not in KEY_NAMES:
+        raise ValueError(f"key: unknown key {key!r} (use e.g. 'D', 'F#' or 'Bb')")
+    scale_spec = spec.get("scale", "major")
+    if isinstance(scale_spec, str):
+        if scale_spec not in SCALES:
+            raise ValueError(f"scale: unknown scale {scale_spec!r} (one of {', '.join(SCALES)})")
+        scale, scale_name = SCALES[scale_spec], scale_spec
+    elif isinstance(scale_spec, list) and scale_spec and scale_spec[0] == 0 and \
+            all(isinstance(step, int) for step in scale_spec) and \
+            all(a < b for a, b in zip(scale_spec, scale_spec[1:])) and scale_spec[-1] < 12:
+        scale, scale_name = tuple(scale_spec), "custom"
+    else:
+        raise ValueError("scale: expected a scale name or rising semitone steps starting at 0, e.g. [0, 2, 4, 5, 7, 9, 11]")
+    octave = _check_int(spec.get("octave", 4), -1, 8, "octave")
+    tonic = 12 * (octave + 1) + KEY_NAMES[key]
+    velocity = _check_int(spec.get("velocity", 127), 1, 127, "velocity")
+    channel = _check_int(spec.get("channel", 0), 0, 15, "channel")
+
+    hands = spec.get("hands")
+    if not isinstance(hands, dict) or not hands:
+        raise ValueError("hands: expected an object with 'left' and/or 'right'")
+    unknown = set(hands) - set(HANDS)
+    if unknown:
+        raise ValueError(f"hands: unknown hands {sorted(unknown)}")
+
+    notes, names, velocities, channels, hand_velocities, combo = [], [], [], [], [], []
+    for hand in HANDS:
+        entry = hands.get(hand, {})
+        if not isinstance(entry, dict):
+            raise ValueError(f"hands.{hand}: expected an object")
+        unknown = set(entry) - set(FINGERS) - {"velocity", "channel"}
+        if unknown:
+            raise ValueError(f"hands.{hand}: unknown fields {sorted(unknown)}")
+        hand_velocity = _check_int(entry.get("velocity", velocity), 1, 127, f"hands.{hand}.velocity")
+        channels.append(_check_int(entry.get("channel", channel), 0, 15, f"hands.{hand}.channel"))
+        hand_velocities.append(hand_velocity)
+        hand_notes, hand_names = [], []
+        for finger in FINGERS:
+            if finger in entry:
+                chord_notes, name, finger_velocity = _parse_chord(
+                    entry[finger], tonic, scale, f"hands.{hand}.{finger}")
+                name = name or chord_name(chord_notes)
+            else:
+                chord_notes, name, finger_velocity = (), "", None
+            hand_notes.append(chord_notes)
+            hand_names.append(name)
+            velocities.append(finger_velocity or hand_velocity)
+        notes.extend(hand_notes)
+        names.extend(hand_names)
+        table = ChordTable(combo_voicings(hand_notes, tonic, scale, hand_names))
+        if any(note > MAX_NOTE for chord in table.notes for note in chord):
+            raise ValueError(f"hands.{hand}: a finger combination goes above MIDI note {MAX_NOTE}")
+        combo.append(table)
+
+    return ChordMapping(
+        source=source, key=key, scale_name=scale_name,
+        notes=tuple(notes), names=tuple(names), velocities=tuple(velocities),
+        channels=tuple(channels), hand_velocities=tuple(hand_velocities), combo=tuple(combo),
+        panel_lines=_panel_lines(key, scale_name, names),
+    )
+
+
+def _panel_lines(key, scale_name, names):
+    """The three HUD instruction lines describing this mapping"""
+    def labelled(hand_names, fingers):
+        return ", ".join(f"{finger.capitalize()}={name}" for finger, name in zip(FINGERS, hand_names)
+                         if name and finger in fingers)
+    left, right = names[:FINGERS_PER_HAND], names[FINGERS_PER_HAND:]
+    first = f"Raise fingers to play chords in {key} {scale_name.capitalize()} scale"
+    if left == right:
+        return (first, labelled(right, FINGERS[:3]), f"{labelled(right, FINGERS[3:])} | Press 'q' to quit")
+    return (first, "L: " + ", ".join(name for name in left if name),
+            "R: " + ", ".join(name for name in right if name) + " | 'q' quits")
+
+
+def load_mapping(path):
+    """Read, validate and compile a JSON mapping file"""
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            spec = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: invalid JSON ({e})") from None
+    return compile_mapping(spec, source=path)
+
+
+def default_mapping():
+    return compile_mapping(DEFAULT_MAPPING)
+
+
+class MappingWatcher:
+    """Polls a mapping file and recompiles it on a background thread when it changes.
+
+    on_change(mapping) receives each new ChordMapping; files that fail to
+    load are reported and the current mapping stays in place.
+    """
+    def __init__(self, path, on_change, interval=0.5):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._stamp = self._file_stamp()
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="mapping-watcher", daemon=True)
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            stamp = self._file_stamp()
+            if stamp is None or stamp == self._stamp:
+                continue
+            self._stamp = stamp
+            try:
+                mapping = load_mapping(self.path)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Chord mapping not reloaded, keeping the current one: {e}")
+                continue
+            self.on_change(mapping)
+            print(f"🔄 Chord mapping reloaded: {mapping.key} {mapping.scale_name} from {self.path}")
+
+    def stop(self):
+        self._stop.set()
+        if self.thread.is_alive():
+            self.thread.join(timeout=1.0)
@@ -0,0 +1,99 @@
+"""
+Finger-combination chords for Air-Piano
+Each hand's 5-bit finger mask indexes a 32-entry chord table, and every
+one of the 32 x 32 mask transitions is precomputed into the notes to turn
+on and off, so a frame costs one lookup and only changed notes are sent.
+"""
+
+NUM_MASKS = 32  # 5 fingers -> 2**5 finger combinations
+MAJOR_SCALE = (0, 2, 4, 5, 7, 9, 11)
+NOTE_NAMES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+TRIAD_QUALITIES = {(4, 7): "Major", (3, 7): "Minor", (3, 6): "Diminished", (4, 8): "Augmented"}
+# Scale steps above the root added by each higher raised finger
+EXTENSIONS = ((6, "7"), (8, "9"), (10, "11"), (12, "13"))
+MAX_NOTE = 127  # Highest MIDI note number
+
+
+def diatonic_note(tonic, scale, degree):
+    """MIDI note of a scale degree counted from the tonic (degree 7 = one octave up)"""
+    octave, step = divmod(degree, len(scale))
+    return tonic + 12 * octave + scale[step]
+
+
+def triad_name(notes):
+    root, third, fifth = notes
+    quality = TRIAD_QUALITIES.get((third - root, fifth - root), "")
+    return f"{NOTE_NAMES[root % 12]} {quality}".strip()
+
+
+def scale_degree(tonic, scale, note):
+    """Scale degree of a MIDI note relative to the tonic, or None if it is not in the scale"""
+    octave, pitch = divmod(note - tonic, 12)
+    if pitch not in scale:
+        return None
+    return octave * len(scale) + scale.index(pitch)
+
+
+def chord_name(notes):
+    """Triad name ("F# Minor") when the notes form one, else the note names"""
+    if len(notes) == 3 and (notes[1] - notes[0], notes[2] - notes[0]) in TRIAD_QUALITIES:
+        return triad_name(notes)
+    return " ".join(NOTE_NAMES[note % 12] for note in notes)
+
+
+def combo_voicings(finger_chords, tonic=62, scale=MAJOR_SCALE, finger_names=None):
+    """32 (notes, name) voicings for one hand from its five finger chords.
+
+    The lowest raised finger with a chord picks the base chord; each raised
+    finger above it adds one extension (7th, 9th, 11th, 13th by distance
+    from that finger), counted in the scale when the chord's root is in it
+    and in the major scale from the root otherwise. Extensions that would
+    go above MIDI note 127 are left out. Fingers without a chord (None or
+    empty) are ignored; mask 0 is silence.
+    """
+    finger_names = finger_names or [chord_name(tuple(notes)) if notes else "" for notes in finger_chords]
+    voicings = [((), "")]
+    for mask in range(1, NUM_MASKS):
+        fingers = [i for i in range(5) if mask & (1 << i) and finger_chords[i]]
+        if not fingers:
+            voicings.append(((), ""))
+            continue
+        lowest = fingers[0]
+        base = list(finger_chords[lowest])
+        root = min(base)
+        degree = scale_degree(tonic, scale, root)
+        notes, labels = list(base), []
+        for finger in fingers[1:]:
+            step, label = EXTENSIONS[finger - lowest - 1]
+            note = (diatonic_note(root, MAJOR_SCALE, step) if degree is None
+                    else diatonic_note(tonic, scale, degree + step))
+            if note > MAX_NOTE:
+                continue  # Above the MIDI range: the extension is left out
+            notes.append(note)
+            labels.append(label)
+        name = finger_names[lowest] + (" +" + "+".join(labels) if labels else "")
+        voicings.append((tuple(notes), name))
+    return voicings
+
+
+class ChordTable:
+    """Chord per finger mask plus precomputed note deltas between masks.
+
+    transition(prev, mask) returns (note_ons, note_offs) as sorted tuples:
+    the notes of mask's chord not in prev's, and the other way round.
+    """
+    def __init__(self, voicings):
+        if len(voicings) != NUM_MASKS:
+            raise ValueError(f"Expected {NUM_MASKS} voicings, got {len(voicings)}")
+        self.notes = tuple(tuple(sorted(set(notes))) for notes, _ in voicings)
+        self.names = tuple(name for _, name in voicings)
+        note_sets = [frozenset(notes) for notes in self.notes]
+        # Flat list indexed by prev * 32 + mask
+        self.transitions = tuple(
+            (tuple(sorted(note_sets[new] - note_sets[prev])),
+             tuple(sorted(note_sets[prev] - note_sets[new])))
+            for prev in range(NUM_MASKS) for new in range(NUM_MASKS)
+        )
+
+    def transition(self, prev, mask):
+        return self.transitions[prev * NUM_MASKS + mask]
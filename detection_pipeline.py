@@ -0,0 +1,232 @@
+"""
+Multi-process hand detection for Air-Piano
+HandDetector runs in worker processes. Frames travel through a ring of
+preallocated multiprocessing.shared_memory slots (the caller writes each
+frame straight into its slot), and landmarks come back through a small
+shared result array, so only slot/sequence numbers cross the queues.
+"""
+
+import multiprocessing as mp
+import queue
+import signal
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+from landmark_recording import NUM_LANDMARKS
+
+MAX_HANDS = 2  # HandDetector runs MediaPipe with max_num_hands=2
+STARTUP_TIMEOUT = 60.0  # Seconds every worker gets to import and load MediaPipe
+
+# One record per frame slot, written by the worker that processed it
+result_dtype = np.dtype([
+    ("count", "<i4"),                                     # Hands detected
+    ("process_ms", "<f8"),                                # Worker time for the whole frame
+    ("handedness", "u1", (MAX_HANDS,)),
+    ("landmarks", "<i4", (MAX_HANDS, NUM_LANDMARKS, 2)),
+])
+
+
+def _worker_main(index, frame_name, result_name, shape, slots, tasks, done, detector_kwargs):
+    """Worker process: detect hands in the slots named on the task queue"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C goes to the parent, whose shutdown stops us
+    from hand_detector import HandDetector  # Only workers need MediaPipe
+    frame_shm = shared_memory.SharedMemory(name=frame_name)
+    result_shm = shared_memory.SharedMemory(name=result_name)
+    frames = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=frame_shm.buf)
+    results = np.ndarray(slots, dtype=result_dtype, buffer=result_shm.buf)
+    detector = HandDetector(**detector_kwargs)
+    done.put(("ready", index, 0.0))
+    record = None
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            slot, seq = task
+            start = time.perf_counter()
+            landmarks, handedness, _ = detector.findHandsArray(frames[slot], draw=False)
+            n = min(len(landmarks), MAX_HANDS)
+            record = results[slot]
+            record["count"] = n
+            record["handedness"][:n] = handedness[:n]
+            record["landmarks"][:n] = landmarks[:n]
+            record["process_ms"] = (time.perf_counter() - start) * 1000
+            done.put((slot, seq, record["process_ms"]))
+    finally:
+        del frames, results, record
+        frame_shm.close()
+        result_shm.close()
+
+
+class DetectionPipeline:
+    """Round-robin hand detection across worker processes.
+
+    process(img) writes the frame into a free shared slot (first blocking on
+    the oldest result when max_in_flight frames are queued), dispatches it
+    to the next worker and returns every result that is ready, in
+    submission order, as (seq, frame, landmarks, handedness) tuples. frame is a view of the
+    shared slot and stays valid until the next process()/drain() call.
+
+    Each worker's detector only sees every workers-th frame, so ROI and
+    optical-flow tracking work on a correspondingly lower frame rate.
+    """
+    def __init__(self, shape, workers=2, max_in_flight=None, transform=None, **detector_kwargs):
+        self.shape = tuple(shape)
+        self.workers = workers
+        # Default: one frame being detected and one queued per worker
+        self.max_in_flight = max_in_flight or 2 * workers
+        # In-flight frames plus frames loaned to the caller never exceed
+        # max_in_flight, so one extra slot always leaves room for the next frame
+        self.slots = self.max_in_flight + 1
+        self.transform = transform  # Optional fn(src, dst) that writes src into a slot, e.g. a flip
+        frame_bytes = int(np.prod(self.shape))
+        self._frame_shm = shared_memory.SharedMemory(create=True, size=frame_bytes * self.slots)
+        self._result_shm = shared_memory.SharedMemory(create=True, size=result_dtype.itemsize * self.slots)
+        self.frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=self._frame_shm.buf)
+        self.results = np.ndarray(self.slots, dtype=result_dtype, buffer=self._result_shm.buf)
+
+        self._free = list(range(self.slots))
+        self._loaned = []              # Slots handed back to the caller by the last call
+        self._done = {}                # seq -> (slot, process_ms) finished out of order
+        self._submitted_at = {}        # seq -> time.perf_counter() at submission
+        self._next_submit = 0
+        self._next_result = 0
+
+        # Statistics
+        self.completed = 0
+        self.latency_total = 0.0       # Submit-to-result seconds, summed
+        self.process_total = 0.0       # Worker seconds, summed
+        self.started_at = None
+
+        ctx = mp.get_context()
+        self._done_queue = ctx.Queue()
+        self._task_queues = [ctx.Queue() for _ in range(workers)]
+        self._processes = [
+            ctx.Process(target=_worker_main, daemon=True,
+                        args=(i, self._frame_shm.name, self._result_shm.name, self.shape,
+                              self.slots, self._task_queues[i], self._done_queue, detector_kwargs))
+            for i in range(workers)
+        ]
+        for process in self._processes:
+            process.start()
+        # Wait for MediaPipe to load everywhere so startup isn't counted as latency
+        try:
+            self._wait_ready()
+        except BaseException:
+            self.close()
+            raise
+
+    def _wait_ready(self):
+        """Block until every worker reports ready; RuntimeError if one dies or hangs"""
+        deadline = time.perf_counter() + STARTUP_TIMEOUT
+        ready = 0
+        while ready < self.workers:
+            try:
+                self._done_queue.get(timeout=0.5)
+            except queue.Empty:
+                dead = [process for process in self._processes if not process.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Detection worker exited with code {dead[0].exitcode} while starting")
+                if time.perf_counter() > deadline:
+                    raise RuntimeError(f"Detection workers not ready after {STARTUP_TIMEOUT:.0f} s")
+                continue
+            ready += 1
+
+    @property
+    def in_flight(self):
+        return self._next_submit - self._next_result
+
+    def _collect(self, block):
+        """Move finished work from the done queue into the reorder buffer"""
+        try:
+            slot, seq, process_ms = self._done_queue.get(block=block, timeout=5.0 if block else None)
+        except queue.Empty:
+            if block:
+                raise RuntimeError("Detection worker stopped responding")
+            return False
+        self._done[seq] = (slot, process_ms)
+        return True
+
+    def _ready(self):
+        """Pop results that are next in sequence order"""
+        ready = []
+        now = time.perf_counter()
+        while self._next_result in self._done:
+            seq = self._next_result
+            slot, process_ms = self._done.pop(seq)
+            record = self.results[slot]
+            n = int(record["count"])
+            ready.append((seq, self.frames[slot],
+                          record["landmarks"][:n].copy(), record["handedness"][:n].copy()))
+            self._loaned.append(slot)
+            self.latency_total += now - self._submitted_at.pop(seq)
+            self.process_total += process_ms / 1000
+            self.completed += 1
+            self._next_result += 1
+        return ready
+
+    def _return_loans(self):
+        self._free.extend(self._loaned)
+        self._loaned.clear()
+
+    def process(self, img):
+        if img.shape != self.shape:
+            raise ValueError(f"Frame shape {img.shape} does not match pipeline shape {self.shape}")
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+        self._return_loans()
+        ready = []
+        while self.in_flight >= self.max_in_flight:
+            # Workers are saturated: wait for the oldest frame to come back
+            self._collect(block=True)
+            ready.extend(self._ready())
+
+        slot = self._free.pop()
+        if self.transform is not None:
+            self.transform(img, self.frames[slot])
+        else:
+            self.frames[slot] = img
+        seq = self._next_submit
+        self._next_submit += 1
+        self._submitted_at[seq] = time.perf_counter()
+        self._task_queues[seq % self.workers].put((slot, seq))
+
+        while self._collect(block=False):
+            pass
+        return ready + self._ready()
+
+    def drain(self):
+        """Wait for every frame still in flight; returns their results in order"""
+        self._return_loans()
+        ready = []
+        while self.in_flight:
+            self._collect(block=True)
+            ready.extend(self._ready())
+        return ready
+
+    def stats(self):
+        """(throughput FPS, mean submit-to-result ms, mean pipeline overhead ms)"""
+        if not self.completed:
+            return 0.0, 0.0, 0.0
+        elapsed = time.perf_counter() - self.started_at
+        latency = self.latency_total / self.completed
+        overhead = latency - self.process_total / self.completed
+        return self.completed / elapsed, latency * 1000, overhead * 1000
+
+    def close(self):
+        """Stop the workers and unlink the shared memory (safe to call twice)"""
+        if self._frame_shm is None:
+            return
+        for tasks in self._task_queues:
+            tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        del self.frames, self.results
+        self._frame_shm.close()
+        self._frame_shm.unlink()
+        self._result_shm.close()
+        self._result_shm.unlink()
+        self._frame_shm = self._result_shm = None
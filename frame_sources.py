@@ -0,0 +1,173 @@
+"""
+Frame sources for Air-Piano
+Lets the main loop run from a webcam, a recorded video, a folder of images
+or generated frames, so detection can be benchmarked without a camera.
+"""
+
+import os
+import time
+import numpy as np
+import cv2
+
+PACING_REALTIME = "realtime"  # Deliver frames at the source frame rate
+PACING_FAST = "fast"          # Deliver frames as fast as they are requested
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class FrameSource:
+    """Base class for anything main() can read frames from.
+
+    Mirrors the small part of cv2.VideoCapture the loop uses: read(),
+    set() and release(). Subclasses implement _read_frame().
+    """
+    def __init__(self, fps=30.0, pacing=PACING_REALTIME):
+        if pacing not in (PACING_REALTIME, PACING_FAST):
+            raise ValueError(f"Unknown pacing mode: {pacing}")
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.pacing = pacing
+        self.finished = False  # True once a non-looping source runs out
+        self._next_deadline = None
+
+    def _read_frame(self):
+        raise NotImplementedError
+
+    def read(self):
+        success, img = self._read_frame()
+        if success and self.pacing == PACING_REALTIME:
+            self._wait_for_deadline()
+        return success, img
+
+    def _wait_for_deadline(self):
+        now = time.perf_counter()
+        if self._next_deadline is None or now - self._next_deadline > 1.0:
+            # First frame, or we fell far behind: restart the clock
+            self._next_deadline = now
+        delay = self._next_deadline - now
+        if delay > 0:
+            time.sleep(delay)
+        self._next_deadline += 1.0 / self.fps
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        pass
+
+
+class CameraSource(FrameSource):
+    """Live webcam; the camera itself sets the pace."""
+    def __init__(self, index=0):
+        super().__init__(pacing=PACING_FAST)
+        self.cap = cv2.VideoCapture(index)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    def _read_frame(self):
+        return self.cap.read()
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """Recorded video file, optionally looping back to the start."""
+    def __init__(self, path, loop=True, pacing=PACING_REALTIME):
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open video file: {path}")
+        super().__init__(fps=self.cap.get(cv2.CAP_PROP_FPS), pacing=pacing)
+        self.path = path
+        self.loop = loop
+
+    def _read_frame(self):
+        success, img = self.cap.read()
+        if not success and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, img = self.cap.read()
+        if not success:
+            self.finished = True
+        return success, img
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectorySource(FrameSource):
+    """Folder of still frames played back in file-name order."""
+    def __init__(self, directory, fps=30.0, loop=True, pacing=PACING_REALTIME, preload=False):
+        super().__init__(fps=fps, pacing=pacing)
+        self.paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.paths:
+            raise IOError(f"No images found in: {directory}")
+        self.loop = loop
+        self.index = 0
+        # Decoding up front keeps imread out of throughput measurements
+        self.frames = [cv2.imread(p) for p in self.paths] if preload else None
+
+    def _read_frame(self):
+        if self.index >= len(self.paths):
+            if not self.loop:
+                self.finished = True
+                return False, None
+            self.index = 0
+        if self.frames is not None:
+            img = self.frames[self.index].copy()
+        else:
+            img = cv2.imread(self.paths[self.index])
+        self.index += 1
+        return img is not None, img
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames: a moving bright blob over a gradient background.
+
+    A fixed set of frames is rendered once and cycled, so reading costs only
+    a copy. Useful for measuring loop overhead with no input files at all.
+    """
+    def __init__(self, width=640, height=480, fps=30.0, pacing=PACING_REALTIME,
+                 num_frames=60, max_frames=None):
+        super().__init__(fps=fps, pacing=pacing)
+        self.max_frames = max_frames
+        self.count = 0
+        gradient = np.linspace(40, 120, width, dtype=np.uint8)
+        background = np.dstack([np.tile(gradient, (height, 1))] * 3)
+        self.frames = []
+        for i in range(num_frames):
+            frame = background.copy()
+            angle = 2 * np.pi * i / num_frames
+            center = (int(width / 2 + width / 4 * np.cos(angle)),
+                      int(height / 2 + height / 4 * np.sin(angle)))
+            cv2.circle(frame, center, min(width, height) // 8, (180, 200, 230), -1)
+            self.frames.append(frame)
+
+    def _read_frame(self):
+        if self.max_frames is not None and self.count >= self.max_frames:
+            self.finished = True
+            return False, None
+        img = self.frames[self.count % len(self.frames)].copy()
+        self.count += 1
+        return True, img
+
+
+def open_frame_source(spec="camera:0", pacing=PACING_REALTIME, loop=True):
+    """Create a frame source from a command-line style spec.
+
+    camera[:index], video:<path>, images:<directory>, synthetic[:WxH]
+    """
+    kind, _, arg = spec.partition(":")
+    if kind == "camera":
+        return CameraSource(int(arg) if arg else 0)
+    if kind == "video":
+        return VideoFileSource(arg, loop=loop, pacing=pacing)
+    if kind == "images":
+        return ImageDirectorySource(arg, loop=loop, pacing=pacing)
+    if kind == "synthetic":
+        width, height = (int(v) for v in arg.split("x")) if arg else (640, 480)
+        return SyntheticSource(width, height, pacing=pacing)
+    raise ValueError(f"Unknown frame source: {spec}")
@@ -0,0 +1,201 @@
+"""
+Batch gesture engine for Air-Piano
+Turns a whole block of landmarks into MIDI note events in one vectorized
+pass, with the same rules as the live loop (update_chords): finger masks,
+per-hand state that holds while only the other hand is visible, sustain
+after release that is cancelled by raising the finger again, and notes
+shared between chords reference-counted per channel.
+
+    engine = GestureEngine(mode=CHORD_MODE_COMBO, sustain=2.0)
+    events = engine.events(timestamps, landmarks, handedness)
+    # events["time"], events["note"], events["velocity"], events["on"], events["channel"]
+
+    python gesture_engine.py session.lm --mapping chord_mapping.json
+"""
+
+import numpy as np
+from hand_detector import HandDetector
+from landmark_recording import HAND_LEFT, HAND_RIGHT, HAND_NONE, NUM_LANDMARKS
+from chord_mapping import HANDS, FINGERS_PER_HAND, CHORD_MODE_FINGERS, CHORD_MODE_COMBO, default_mapping
+from chord_table import NUM_MASKS
+
+EVENT_DTYPE = np.dtype([
+    ("time", "<f8"),      # Seconds, on the timestamps' clock
+    ("note", "u1"),
+    ("velocity", "u1"),   # Note-offs carry 127, like stop_chord
+    ("on", "?"),          # True = note-on, False = note-off
+    ("channel", "u1"),
+])
+NOTE_OFF_VELOCITY = 127
+
+
+class GestureEngine:
+    """Stateless landmarks -> note events converter for one chord mapping.
+
+    mode: CHORD_MODE_FINGERS (one chord per raised finger) or
+        CHORD_MODE_COMBO (one chord per finger combination).
+    sustain: seconds a released chord keeps sounding (SUSTAIN_TIME live).
+    """
+    def __init__(self, mapping=None, mode=CHORD_MODE_FINGERS, sustain=2.0):
+        if mode not in (CHORD_MODE_FINGERS, CHORD_MODE_COMBO):
+            raise ValueError(f"Unknown chord mode: {mode}")
+        self.mapping = mapping or default_mapping()
+        self.mode = mode
+        self.sustain = sustain
+        if mode == CHORD_MODE_FINGERS:
+            # Unit = finger: held when its bit is set
+            self.units = (np.arange(NUM_MASKS)[:, None] >> np.arange(FINGERS_PER_HAND)) & 1 == 1
+            width = max(1, max(len(notes) for notes in self.mapping.notes))
+            self.chord_notes = np.full((len(self.mapping.notes), width), -1, dtype=np.int16)
+            for k, notes in enumerate(self.mapping.notes):
+                self.chord_notes[k, :len(notes)] = notes
+            self.velocities = np.array(self.mapping.velocities, dtype=np.uint8)
+        else:
+            # Unit = MIDI note of the hand's combo chord, one membership table per hand
+            self.units = np.zeros((len(HANDS), NUM_MASKS, 128), dtype=bool)
+            for h, table in enumerate(self.mapping.combo):
+                for mask, notes in enumerate(table.notes):
+                    self.units[h, mask, list(notes)] = True
+            self.velocities = np.array(self.mapping.hand_velocities, dtype=np.uint8)
+        self.channels = np.array(self.mapping.channels, dtype=np.uint8)
+
+    def masks(self, landmarks, handedness):
+        """(T, H) finger masks from one fingerMasks call over every hand of every frame"""
+        landmarks = np.asarray(landmarks)
+        frames, hands = landmarks.shape[:2]
+        handedness = np.broadcast_to(np.asarray(handedness, dtype=np.uint8), (frames, hands))
+        masks = HandDetector.fingerMasks(landmarks.reshape(-1, NUM_LANDMARKS, 2), handedness.reshape(-1))
+        return masks.reshape(frames, hands)
+
+    def hand_states(self, landmarks, handedness):
+        """(T, 2) finger mask of the left and right hand after each frame.
+
+        A hand that is not detected keeps its mask while the other hand is
+        visible; a frame without hands clears both, as in update_chords.
+        """
+        landmarks = np.asarray(landmarks)
+        frames, hands = landmarks.shape[:2]
+        handedness = np.broadcast_to(np.asarray(handedness, dtype=np.uint8), (frames, hands))
+        masks = self.masks(landmarks, handedness)
+        states = np.full((frames + 1, len(HANDS)), -1, dtype=np.int64)
+        states[0] = 0
+        states[1:][(handedness == HAND_NONE).all(axis=1)] = 0
+        for slot in range(hands):  # Later slots win, like the live loop's order
+            for h, code in enumerate((HAND_LEFT, HAND_RIGHT)):
+                seen = handedness[:, slot] == code
+                states[1:, h][seen] = masks[seen, slot]
+        # Forward-fill "no change" (-1) with the last known mask
+        rows = np.where(states >= 0, np.arange(frames + 1)[:, None], 0)
+        np.maximum.accumulate(rows, axis=0, out=rows)
+        return states[rows, np.arange(len(HANDS))][1:]
+
+    def _unit_intervals(self, timestamps, states):
+        """(hand, unit, on time, off time) of every held finger/note, sustain applied.
+
+        Everything still held is released at the last timestamp, like the
+        empty frame the replay sends after the last recorded one.
+        """
+        end = np.zeros((1, len(HANDS)), dtype=states.dtype)
+        padded = np.vstack([end, states, end])
+        times = np.append(timestamps, timestamps[-1])
+        hands_out, units_out, ons_out, offs_out = [], [], [], []
+        for h in range(len(HANDS)):
+            prev, cur = padded[:-1, h], padded[1:, h]
+            changed = np.flatnonzero(prev != cur)
+            table = self.units if self.mode == CHORD_MODE_FINGERS else self.units[h]
+            before, after = table[prev[changed]], table[cur[changed]]
+            rise_t, rise_u = np.nonzero(after & ~before)
+            fall_t, fall_u = np.nonzero(before & ~after)
+            # Every rise has a later fall; pair them per unit in time order
+            rise = np.lexsort((rise_t, rise_u))
+            fall = np.lexsort((fall_t, fall_u))
+            units = rise_u[rise]
+            on = times[changed[rise_t[rise]]]
+            off = times[changed[fall_t[fall]]] + self.sustain
+            # Raising again before the sustained release fires keeps it going
+            starts = np.ones(len(units), dtype=bool)
+            starts[1:] = (units[1:] != units[:-1]) | (on[1:] >= off[:-1])
+            group = np.flatnonzero(starts)
+            hands_out.append(np.full(len(group), h))
+            units_out.append(units[group])
+            ons_out.append(on[group])
+            offs_out.append(np.maximum.reduceat(off, group) if len(group) else off)
+        return (np.concatenate(hands_out), np.concatenate(units_out),
+                np.concatenate(ons_out), np.concatenate(offs_out))
+
+    def events(self, timestamps, landmarks, handedness):
+        """Structured EVENT_DTYPE array of note-ons and note-offs, sorted by time.
+
+        timestamps: (T,) seconds; landmarks: (T, H, 21, 2); handedness:
+            (T, H) or (H,) hand codes, HAND_NONE for empty slots.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if not len(timestamps):
+            return np.zeros(0, dtype=EVENT_DTYPE)
+        states = self.hand_states(landmarks, handedness)
+        hands, units, on, off = self._unit_intervals(timestamps, states)
+        # Expand units to (channel, note) voices with their velocity
+        channels = self.channels[hands]
+        if self.mode == CHORD_MODE_FINGERS:
+            k = hands * FINGERS_PER_HAND + units
+            notes = self.chord_notes[k]
+            valid = notes >= 0
+            repeat = valid.sum(axis=1)
+            notes = notes[valid]
+            velocities = np.repeat(self.velocities[k], repeat)
+            channels, on, off = np.repeat(channels, repeat), np.repeat(on, repeat), np.repeat(off, repeat)
+        else:
+            notes = units
+            velocities = self.velocities[hands]
+        # A sustained release that falls due on a frame goes out before that frame's presses
+        return note_events(notes, channels, velocities, on, off, releases_first=self.sustain > 0)
+
+
+def note_events(notes, channels, velocities, on, off, releases_first=False):
+    """Merge overlapping (note, channel) intervals into note-on/off events.
+
+    Reference counting like VoiceManager: a voice starts with the first
+    interval that needs it and stops when the last one ends. At equal
+    times presses count before releases (a handover never re-attacks)
+    unless releases_first is set.
+    """
+    count = len(notes)
+    key = np.concatenate([channels, channels]).astype(np.int64) * 128 + np.concatenate([notes, notes])
+    times = np.concatenate([on, off])
+    delta = np.concatenate([np.ones(count, dtype=np.int64), -np.ones(count, dtype=np.int64)])
+    order = np.lexsort((delta if releases_first else -delta, times, key))
+    held = np.cumsum(delta[order])  # Every key's intervals close, so the sum is 0 between keys
+    first_on = (delta[order] > 0) & (held == 1)
+    last_off = (delta[order] < 0) & (held == 0)
+    emit = order[first_on | last_off]
+    emit = emit[np.argsort(times[emit], kind="stable")]
+    events = np.zeros(len(emit), dtype=EVENT_DTYPE)
+    events["time"] = times[emit]
+    events["note"] = key[emit] % 128
+    events["channel"] = key[emit] // 128
+    events["on"] = delta[emit] > 0
+    events["velocity"] = np.where(events["on"], np.concatenate([velocities, velocities])[emit], NOTE_OFF_VELOCITY)
+    return events
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from chord_mapping import load_mapping
+    from landmark_recording import LandmarkRecording
+
+    parser = argparse.ArgumentParser(description="Convert a landmark recording to note events in one batch")
+    parser.add_argument("recording", help="landmark recording made with air_piano_main.py --record")
+    parser.add_argument("--mapping", metavar="PATH", help="JSON chord mapping (default: built-in D major)")
+    parser.add_argument("--chord-mode", choices=[CHORD_MODE_FINGERS, CHORD_MODE_COMBO], default=CHORD_MODE_FINGERS)
+    parser.add_argument("--sustain", type=float, default=2.0, help="seconds a released chord keeps sounding")
+    args = parser.parse_args()
+
+    timestamps, landmarks, handedness = LandmarkRecording(args.recording).arrays()
+    engine = GestureEngine(load_mapping(args.mapping) if args.mapping else None, args.chord_mode, args.sustain)
+    start = time.perf_counter()
+    events = engine.events(timestamps, landmarks, handedness)
+    elapsed = time.perf_counter() - start
+    duration = timestamps[-1] - timestamps[0] if len(timestamps) else 0.0
+    print(f"🎼 {len(events)} note events from {len(timestamps)} frames ({duration:.1f} s) "
+          f"in {elapsed * 1000:.1f} ms ({len(timestamps) / max(elapsed, 1e-9):.0f} frames/s)")
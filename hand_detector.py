@@ -0,0 +1,367 @@
+"""
+Hand detection for Air-Piano
+MediaPipe Hands wrapped with ROI cropping, adaptive inference resolution,
+optical-flow tracking between keyframes and vectorized finger masks.
+Kept free of audio/MIDI setup so worker processes can import it cheaply.
+"""
+
+import time
+import cv2
+import numpy as np
+from landmark_recording import HAND_CODES, HAND_LABELS, HAND_RIGHT, NUM_LANDMARKS
+from stage_timing import StageTimer
+
+# Finger order used for masks and chord lookups (bit i of a mask = finger i)
+FINGER_NAMES = ["thumb", "index", "middle", "ring", "pinky"]
+
+# MediaPipe's hand skeleton (mp.solutions.hands.HAND_CONNECTIONS), so drawing
+# landmark arrays never needs the MediaPipe import
+HAND_CONNECTIONS = frozenset([
+    (0, 1), (1, 2), (2, 3), (3, 4),            # Thumb
+    (0, 5), (5, 6), (6, 7), (7, 8),            # Index
+    (5, 9), (9, 10), (10, 11), (11, 12),       # Middle
+    (9, 13), (13, 14), (14, 15), (15, 16),     # Ring
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),  # Pinky and palm
+])
+
+# MediaPipe Hand Detection (replaces cvzone)
+class HandDetector:
+    # Tip and PIP landmark IDs for each finger
+    TIP_IDS = np.array([4, 8, 12, 16, 20])  # Thumb, Index, Middle, Ring, Pinky
+    PIP_IDS = np.array([3, 6, 10, 14, 18])   # PIP joints
+    # Coordinate compared per finger: x for the thumb, y for the others
+    AXES = np.array([0, 1, 1, 1, 1])
+    FINGER_BITS = 1 << np.arange(5)
+    ROI_MIN_SIZE = 160  # Smallest crop (pixels) handed to MediaPipe in ROI mode
+    ROI_MAX_SCALE = 1.5 # Largest change in hand size between frames accepted from a crop
+    ROI_CALIBRATION_FRAMES = 5  # Steady full-frame tracking frames timed before crops start
+    # Inference widths the "auto" resolution mode steps between
+    AUTO_WIDTHS = (256, 320, 424, 480, 640, 800, 960, 1280)
+    AUTO_WINDOW = 30    # Frames averaged before each auto-resolution decision
+    AUTO_ROI_WINDOW = 3 # Full scans averaged per decision in ROI mode (they are rarer)
+    
+    def __init__(self, detectionCon=0.8, roi=False, roi_padding=0.3, full_scan_interval=30,
+                 roi_min_confidence=0.8, inference_width=None, target_frame_ms=20.0,
+                 keyframe_interval=1, flow_max_error=20.0, detect=True):
+        # detect=False skips MediaPipe entirely: the detector only draws and
+        # records landmarks that worker processes detected
+        self.mp_hands = self.hands = self.roi_hands = self.mp_draw = None
+        if detect:
+            self._load_mediapipe(detectionCon, roi)
+        self._full_graph_stale = False  # The tracking graph missed frames that went to roi_hands
+        self._full_graph_fed = False    # The tracking graph has processed a frame since it was built/reset
+        self.recorder = None  # Optional LandmarkRecorder fed with every frame's output
+        self.timing = StageTimer()  # Disabled unless the app shares an enabled one
+        
+        # Region-of-interest mode: run inference on a padded box around the
+        # last known hands, with a full-frame scan every full_scan_interval
+        # frames (to catch a new hand) or whenever the crop loses confidence
+        self.roi = roi
+        self.roi_padding = roi_padding
+        self.full_scan_interval = full_scan_interval
+        self.roi_min_confidence = roi_min_confidence
+        self.last_landmarks = None      # float (n_hands, 21, 2) from the previous frame
+        self.frames_since_full_scan = 0
+        # What the non-ROI path pays per frame: full-frame inference while the
+        # tracking graph follows the hands from frame to frame (landmark model
+        # only). Crops and the full scans after them (graph reset, palm
+        # detection again) are measured against it, so savings can be negative.
+        self.tracking_process_ms = None # Running average of steady full-frame inference time
+        self._tracking_samples = 0
+        self.process_ms = 0.0           # Inference time of the latest frame
+        self.inference_saved_ms = 0.0   # Steady tracking cost minus this frame's inference time
+        
+        # Inference resolution: None = native, an int = max width in pixels,
+        # "auto" = largest width whose process() time meets target_frame_ms.
+        # Landmarks are normalized, so they come back in display coordinates.
+        self.auto_resolution = inference_width == "auto"
+        self.inference_width = self.AUTO_WIDTHS[-1] if self.auto_resolution else inference_width
+        self.target_frame_ms = target_frame_ms
+        self._auto_ms_total = 0.0
+        self._auto_frames = 0
+        self._buffers = {}  # Preallocated resize/colour-conversion destinations
+        
+        # Sparse detection: MediaPipe every keyframe_interval frames, optical
+        # flow in between; re-sync early when the flow error grows too large
+        self.keyframe_interval = keyframe_interval
+        self.flow_max_error = flow_max_error
+        self.frames_since_keyframe = 0
+        self.last_handedness = np.zeros(0, dtype=np.uint8)
+        self.tracked = False            # True when the latest frame came from optical flow
+        self._gray_buffers = [None, None]
+        self._gray_index = 0
+        self._prev_gray = None
+    
+    def _load_mediapipe(self, detectionCon, roi):
+        import mediapipe as mp  # Heavy import; paid by whoever builds the first detector
+        self.mp_hands = mp.solutions.hands
+        self.hands = self.mp_hands.Hands(
+            static_image_mode=False,
+            max_num_hands=2,
+            min_detection_confidence=detectionCon,
+            min_tracking_confidence=0.5
+        )
+        # Crops change size and position every frame, which would hand the
+        # tracking graph above a stale hand region, so they get their own
+        # graph that detects from scratch on every image
+        self.roi_hands = self.mp_hands.Hands(
+            static_image_mode=True,
+            max_num_hands=2,
+            min_detection_confidence=detectionCon
+        ) if roi else None
+        self.mp_draw = mp.solutions.drawing_utils
+    
+    def _buffer(self, name, shape):
+        """Reusable destination array; only reallocated when the shape changes"""
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape:
+            buf = self._buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buf
+    
+    def _process(self, img, full_frame=True):
+        """Run MediaPipe on a BGR frame or ROI crop; returns (results, milliseconds)"""
+        h, w = img.shape[:2]
+        if self.inference_width and w > self.inference_width:
+            size = (self.inference_width, max(int(h * self.inference_width / w), 1))
+            img = cv2.resize(img, size, dst=self._buffer("resize", (size[1], size[0], 3)),
+                             interpolation=cv2.INTER_AREA)
+        with self.timing.stage("cvtColor"):
+            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self._buffer("rgb", img.shape))
+        start = time.perf_counter()
+        steady = False
+        if full_frame:
+            steady = self._full_graph_fed and not self._full_graph_stale
+            if self._full_graph_stale:
+                self.hands.reset()  # Drop the hand region tracked before the crops
+                self._full_graph_stale = False
+            results = self.hands.process(img_rgb)
+            self._full_graph_fed = True
+        else:
+            results = self.roi_hands.process(img_rgb)
+            self._full_graph_stale = True
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.timing.record("hands.process", elapsed_ms)
+        if steady:
+            self._tracking_samples += 1
+            self.tracking_process_ms = elapsed_ms if self.tracking_process_ms is None else \
+                0.9 * self.tracking_process_ms + 0.1 * elapsed_ms
+        if self.auto_resolution and full_frame:
+            # Only full frames: crop timings and widths say nothing about the frame
+            self._adapt_resolution(elapsed_ms, w)
+        return results, elapsed_ms
+    
+    def _adapt_resolution(self, elapsed_ms, native_width):
+        """Step the inference width down when process() is over budget, up when well under"""
+        self._auto_ms_total += elapsed_ms
+        self._auto_frames += 1
+        if self._auto_frames < (self.AUTO_ROI_WINDOW if self.roi else self.AUTO_WINDOW):
+            return
+        average_ms = self._auto_ms_total / self._auto_frames
+        self._auto_ms_total, self._auto_frames = 0.0, 0
+        widths = [wd for wd in self.AUTO_WIDTHS if wd <= native_width] or [self.AUTO_WIDTHS[0]]
+        current = min(range(len(widths)), key=lambda i: abs(widths[i] - min(self.inference_width, native_width)))
+        if average_ms > self.target_frame_ms and current > 0:
+            self.inference_width = widths[current - 1]
+        elif average_ms < 0.6 * self.target_frame_ms and current < len(widths) - 1:
+            self.inference_width = widths[current + 1]
+        else:
+            return
+        print(f"📐 Inference width -> {self.inference_width}px ({average_ms:.1f} ms per frame)")
+    
+    def _roi_box(self, width, height):
+        """Padded bounding box (x0, y0, x1, y1) around the last known landmarks"""
+        points = self.last_landmarks.reshape(-1, 2)
+        x0, y0 = points.min(axis=0)
+        x1, y1 = points.max(axis=0)
+        # Pad by a fraction of the hand size, but never crop below ROI_MIN_SIZE
+        pad = self.roi_padding * max(x1 - x0, y1 - y0)
+        pad_x = max(pad, (self.ROI_MIN_SIZE - (x1 - x0)) / 2)
+        pad_y = max(pad, (self.ROI_MIN_SIZE - (y1 - y0)) / 2)
+        return (int(max(x0 - pad_x, 0)), int(max(y0 - pad_y, 0)),
+                int(min(x1 + pad_x, width)), int(min(y1 + pad_y, height)))
+    
+    def _hand_points(self, results, x0, y0, x1, y1):
+        """Crop-normalized landmarks, full-frame pixel points and handedness codes"""
+        normalized = np.array(
+            [[(lm.x, lm.y) for lm in hand.landmark] for hand in results.multi_hand_landmarks],
+            dtype=np.float32,
+        )
+        # Map crop-normalized coordinates back to full-frame pixels
+        points = normalized * np.array([x1 - x0, y1 - y0], dtype=np.float32) \
+            + np.array([x0, y0], dtype=np.float32)
+        handedness = np.array(
+            [HAND_CODES[c.classification[0].label] for c in results.multi_handedness],
+            dtype=np.uint8,
+        )
+        return normalized, points, handedness
+    
+    @staticmethod
+    def _hand_sizes(points):
+        """Sorted bounding-box size (larger side, pixels) of each hand"""
+        extent = points.max(axis=1) - points.min(axis=1)
+        return np.sort(extent.max(axis=1))
+    
+    def _roi_plausible(self, results, normalized, points, handedness):
+        """Whether crop landmarks look like the hands the crop was cut around.
+
+        The handedness score alone says nothing about the landmarks, so the
+        crop must also find the same hands, wholly inside the crop (a hand
+        cut by its edge needs a full scan), at about their previous size.
+        """
+        if len(handedness) != len(self.last_landmarks):
+            return False
+        if any(c.classification[0].score < self.roi_min_confidence for c in results.multi_handedness):
+            return False
+        if normalized.min() < 0.0 or normalized.max() > 1.0:
+            return False
+        if sorted(handedness.tolist()) != sorted(self.last_handedness.tolist()):
+            return False
+        ratio = self._hand_sizes(points) / np.maximum(self._hand_sizes(self.last_landmarks), 1.0)
+        return bool(((ratio > 1.0 / self.ROI_MAX_SCALE) & (ratio < self.ROI_MAX_SCALE)).all())
+    
+    def _detect(self, img, draw):
+        """Run MediaPipe (full frame or ROI); returns float points and handedness"""
+        h, w = img.shape[:2]
+        results = None
+        roi_ms = 0.0
+        if (self.roi and self.last_landmarks is not None
+                and self._tracking_samples >= self.ROI_CALIBRATION_FRAMES
+                and self.frames_since_full_scan < self.full_scan_interval):
+            x0, y0, x1, y1 = self._roi_box(w, h)
+            region = img[y0:y1, x0:x1]  # View: drawing on it draws on the frame
+            results, roi_ms = self._process(region, full_frame=False)
+            hand_points = None
+            if results.multi_hand_landmarks:
+                t = self.timing.mark()
+                hand_points = self._hand_points(results, x0, y0, x1, y1)
+                self.timing.lap("landmarks", t)
+            if hand_points is not None and self._roi_plausible(results, *hand_points):
+                self.frames_since_full_scan += 1
+                self.process_ms = roi_ms
+                self.inference_saved_ms = self.tracking_process_ms - roi_ms
+            else:
+                results = None  # Lost the hand(s): fall back to a full-frame scan
+        
+        if results is None:
+            region, x0, y0, x1, y1 = img, 0, 0, w, h
+            results, full_ms = self._process(img)
+            self.frames_since_full_scan = 0
+            self.process_ms = roi_ms + full_ms
+            # A failed crop and a post-reset palm detection are pure overhead
+            self.inference_saved_ms = (self.tracking_process_ms or full_ms) - self.process_ms
+            if not results.multi_hand_landmarks:
+                return None, np.zeros(0, dtype=np.uint8)
+            t = self.timing.mark()
+            hand_points = self._hand_points(results, x0, y0, x1, y1)
+            self.timing.lap("landmarks", t)
+        
+        if draw:
+            with self.timing.stage("draw landmarks"):
+                for hand_landmarks in results.multi_hand_landmarks:
+                    self.mp_draw.draw_landmarks(region, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
+        
+        _, points, handedness = hand_points
+        return points, handedness
+    
+    def _track(self, gray):
+        """Propagate the last landmarks with pyramidal Lucas-Kanade optical flow.
+
+        Returns the new float points, or None when any point is lost or the
+        mean tracking error exceeds flow_max_error (time to re-sync).
+        """
+        prev_pts = self.last_landmarks.reshape(-1, 1, 2)
+        next_pts, status, err = cv2.calcOpticalFlowPyrLK(
+            self._prev_gray, gray, prev_pts, None, winSize=(21, 21), maxLevel=3)
+        if next_pts is None or not status.all() or float(err.mean()) > self.flow_max_error:
+            return None
+        h, w = gray.shape
+        points = next_pts.reshape(self.last_landmarks.shape)
+        np.clip(points, 0, [w - 1, h - 1], out=points)
+        return points
+    
+    def drawLandmarks(self, img, landmarks):
+        """Draw landmark arrays (e.g. optical-flow frames) in MediaPipe's style"""
+        for hand in landmarks:
+            for a, b in HAND_CONNECTIONS:
+                cv2.line(img, tuple(int(v) for v in hand[a]), tuple(int(v) for v in hand[b]),
+                         (224, 224, 224), 2)
+            for x, y in hand:
+                cv2.circle(img, (int(x), int(y)), 3, (0, 0, 255), -1)
+    
+    def findHandsArray(self, img, draw=True):
+        """Detect hands and return landmarks as arrays.
+
+        Returns (landmarks, handedness, img): landmarks is an int32
+        (n_hands, 21, 2) array of pixel coordinates and handedness an
+        (n_hands,) uint8 array of HAND_LEFT / HAND_RIGHT codes.
+        With keyframe_interval > 1, MediaPipe runs only on keyframes and
+        the frames in between are tracked with optical flow.
+        """
+        points = None
+        gray = None
+        self.tracked = False
+        if self.keyframe_interval > 1:
+            # Alternate between two buffers so the previous frame survives
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=self._gray_buffers[self._gray_index])
+            self._gray_buffers[self._gray_index] = gray
+            self._gray_index ^= 1
+            if (self.last_landmarks is not None and self._prev_gray is not None
+                    and self.frames_since_keyframe < self.keyframe_interval - 1):
+                with self.timing.stage("optical flow"):
+                    points = self._track(gray)
+                if points is not None:
+                    handedness = self.last_handedness
+                    self.frames_since_keyframe += 1
+                    self.tracked = True
+                    self.process_ms = 0.0
+                    if draw:
+                        self.drawLandmarks(img, points)
+        
+        if points is None:
+            points, handedness = self._detect(img, draw)
+            self.frames_since_keyframe = 0
+        
+        self._prev_gray = gray
+        self.last_landmarks = points
+        self.last_handedness = handedness
+        if points is not None:
+            landmarks = points.astype(np.int32)
+        else:
+            landmarks = np.zeros((0, NUM_LANDMARKS, 2), dtype=np.int32)
+        
+        if self.recorder is not None:
+            self.recorder.write_frame(landmarks, handedness)
+        
+        return landmarks, handedness, img
+    
+    def findHands(self, img, draw=True):
+        """Compatibility view: list of {"type", "landmarks"} dicts per hand"""
+        landmarks, handedness, img = self.findHandsArray(img, draw)
+        hands_data = [
+            {"type": HAND_LABELS[int(code)], "landmarks": lm.tolist()}
+            for lm, code in zip(landmarks, handedness)
+        ]
+        return hands_data, img
+    
+    @classmethod
+    def fingerMasks(cls, landmarks, handedness):
+        """5-bit finger mask per hand (bit 0 = thumb ... bit 4 = pinky).
+
+        A finger is up when its tip is above its PIP joint; the thumb is
+        compared along x instead, mirrored for the right hand.
+        """
+        tips = landmarks[:, cls.TIP_IDS, cls.AXES]
+        pips = landmarks[:, cls.PIP_IDS, cls.AXES]
+        # Flip the sign for the right thumb so one "<" covers every finger
+        sign = np.ones((len(handedness), 5), dtype=np.int32)
+        sign[:, 0] = np.where(handedness == HAND_RIGHT, -1, 1)
+        up = tips * sign < pips * sign
+        return up.dot(cls.FINGER_BITS)
+    
+    @classmethod
+    def fingersUp(cls, hand_data):
+        """Determine which fingers are up based on landmark positions"""
+        landmarks = np.asarray(hand_data["landmarks"])[np.newaxis]
+        handedness = np.array([HAND_CODES[hand_data["type"]]], dtype=np.uint8)
+        mask = int(cls.fingerMasks(landmarks, handedness)[0])
+        return [(mask >> i) & 1 for i in range(5)]
@@ -0,0 +1,98 @@
+"""
+Cached heads-up display for Air-Piano
+The instruction panel is rendered once into a BGRA layer and blended over
+its region only; dynamic text is rasterised only when its value changes.
+"""
+
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+class HudOverlay:
+    """Semi-transparent instruction panel plus cached text patches.
+
+    panel_lines are (text, (x, y), scale, color, thickness) tuples in frame
+    coordinates, drawn at full opacity over a black panel of the given alpha.
+    Like cv2.rectangle, the panel spans rows top..bottom and columns
+    margin..width-margin inclusive.
+    """
+    def __init__(self, top=10, bottom=150, margin=10, alpha=0.7):
+        self.top = top
+        self.bottom = bottom
+        self.margin = margin
+        self.alpha = alpha
+        self._panel_key = None
+        self._panel = None          # (premultiplied BGR, 255 * (1 - alpha) per channel)
+        self._scratch = None
+        self._texts = {}            # slot -> (text, style, premultiplied, inverse alpha, baseline row, padding)
+
+    @staticmethod
+    def _render_text(shape, text, org, scale, color, thickness):
+        """Rasterise text over black: returns (color * coverage, coverage)"""
+        bgr = np.zeros(shape + (3,), dtype=np.uint8)
+        cv2.putText(bgr, text, org, FONT, scale, color, thickness)
+        coverage = np.zeros(shape, dtype=np.uint8)
+        cv2.putText(coverage, text, org, FONT, scale, 255, thickness)
+        return bgr, coverage
+
+    def _build_panel(self, width, bottom, panel_lines):
+        x0, x1 = self.margin, width - self.margin + 1
+        shape = (bottom - self.top, x1 - x0)
+        premultiplied = np.zeros(shape + (3,), dtype=np.uint8)  # The panel itself is black
+        coverage = np.zeros(shape, dtype=np.uint8)
+        for text, (x, y), scale, color, thickness in panel_lines:
+            bgr, cov = self._render_text(shape, text, (x - x0, y - self.top), scale, color, thickness)
+            np.maximum(premultiplied, bgr, out=premultiplied)
+            np.maximum(coverage, cov, out=coverage)
+        # Text covers the panel, so the frame shows through (1 - alpha) * (1 - coverage)
+        inv_alpha = (255 - coverage) * (1.0 - self.alpha)
+        inv_alpha = np.repeat(inv_alpha.round().astype(np.uint8)[:, :, None], 3, axis=2)
+        self._panel = (premultiplied, inv_alpha)
+        self._scratch = np.empty_like(premultiplied)
+
+    def draw_panel(self, img, panel_lines):
+        """Blend the cached panel over its region of img, in place"""
+        height, width = img.shape[:2]
+        bottom = min(self.bottom + 1, height)
+        key = (width, bottom, tuple(panel_lines))
+        if key != self._panel_key:
+            self._build_panel(width, bottom, panel_lines)
+            self._panel_key = key
+        premultiplied, inv_alpha = self._panel
+        roi = img[self.top:bottom, self.margin:width - self.margin + 1]
+        # roi = roi * (1 - alpha) + layer * alpha, without temporary frames
+        cv2.multiply(roi, inv_alpha, dst=self._scratch, scale=1.0 / 255)
+        cv2.add(self._scratch, premultiplied, dst=roi)
+
+    def draw_text(self, img, slot, text, org, scale, color, thickness):
+        """Draw text at org (baseline-left, like cv2.putText) from a cached patch.
+
+        The patch for a slot is re-rendered only when its text or style changes.
+        """
+        style = (scale, color, thickness)
+        cached = self._texts.get(slot)
+        if cached is None or cached[0] != text or cached[1] != style:
+            (w, h), baseline = cv2.getTextSize(text, FONT, scale, thickness)
+            base_row = h + thickness  # Baseline position inside the patch
+            shape = (base_row + baseline + thickness, w + 2 * thickness)
+            bgr, coverage = self._render_text(shape, text, (thickness, base_row), scale, color, thickness)
+            inv_alpha = np.repeat((255 - coverage)[:, :, None], 3, axis=2)
+            cached = self._texts[slot] = (text, style, bgr, inv_alpha, base_row, thickness)
+        _, _, bgr, inv_alpha, base_row, pad = cached
+        self._blend(img, bgr, inv_alpha, org[0] - pad, org[1] - base_row)
+
+    @staticmethod
+    def _blend(img, premultiplied, inv_alpha, x, y):
+        """Blend a premultiplied patch onto img at (x, y), clipped to the frame"""
+        h, w = premultiplied.shape[:2]
+        H, W = img.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, W), min(y + h, H)
+        if x0 >= x1 or y0 >= y1:
+            return
+        roi = img[y0:y1, x0:x1]
+        src = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+        cv2.multiply(roi, inv_alpha[src], dst=roi, scale=1.0 / 255)
+        cv2.add(roi, premultiplied[src], dst=roi)
@@ -0,0 +1,143 @@
+"""
+Binary landmark recording and replay for Air-Piano
+Stores HandDetector output as fixed-size records so long sessions can be
+opened with numpy.memmap and replayed without running MediaPipe.
+
+File layout:
+    32-byte header: magic (8s), version (u2), landmark dtype code (2s), reserved
+    N records of RECORD_DTYPE, one per detected hand per frame
+    (frames with no hands get a single record with hand == HAND_NONE)
+"""
+
+import os
+import struct
+import time
+import numpy as np
+
+MAGIC = b"APLMREC1"
+VERSION = 1
+HEADER_FORMAT = "<8sH2s20x"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)  # 32 bytes
+
+# Handedness byte
+HAND_LEFT = 0
+HAND_RIGHT = 1
+HAND_NONE = 255
+HAND_CODES = {"Left": HAND_LEFT, "Right": HAND_RIGHT}
+HAND_LABELS = {HAND_LEFT: "Left", HAND_RIGHT: "Right"}
+
+NUM_LANDMARKS = 21
+
+# Landmark storage: int16 pixel coordinates or float32 (sub-pixel)
+LANDMARK_DTYPES = {b"i2": "<i2", b"f4": "<f4"}
+
+
+def record_dtype(landmark_code=b"i2"):
+    """Fixed-stride record layout (100 bytes for int16 landmarks)."""
+    return np.dtype([
+        ("timestamp", "<f8"),   # Seconds since recording started
+        ("frame", "<u4"),       # Frame index, shared by both hands of a frame
+        ("hand", "u1"),         # HAND_LEFT, HAND_RIGHT or HAND_NONE
+        ("pad", "u1", (3,)),
+        ("landmarks", LANDMARK_DTYPES[landmark_code], (NUM_LANDMARKS, 2)),
+    ])
+
+
+class LandmarkRecorder:
+    """Appends detector output to a recording file in buffered chunks."""
+    def __init__(self, path, landmark_code=b"i2", chunk_size=256):
+        self.dtype = record_dtype(landmark_code)
+        self.file = open(path, "wb")
+        self.file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, landmark_code))
+        self.buffer = np.zeros(chunk_size, dtype=self.dtype)
+        self.count = 0
+        self.frame = 0
+        self.start_time = time.perf_counter()
+
+    def write_frame(self, landmarks, handedness, timestamp=None):
+        """Record one frame of findHandsArray output.
+
+        landmarks: (n_hands, 21, 2) array, handedness: (n_hands,) hand codes.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter() - self.start_time
+        n = max(len(handedness), 1)
+        if self.count + n > len(self.buffer):
+            self.flush()
+        block = self.buffer[self.count:self.count + n]
+        block["timestamp"] = timestamp
+        block["frame"] = self.frame
+        if len(handedness):
+            block["hand"] = handedness
+            block["landmarks"] = landmarks
+        else:
+            block["hand"] = HAND_NONE
+            block["landmarks"] = 0
+        self.count += n
+        self.frame += 1
+
+    def flush(self):
+        if self.count:
+            self.file.write(self.buffer[:self.count].tobytes())
+            self.count = 0
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+class LandmarkRecording:
+    """Memory-mapped, read-only view of a recording file."""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, version, landmark_code = struct.unpack(HEADER_FORMAT, f.read(HEADER_SIZE))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not an Air-Piano landmark recording: {path}")
+        self.dtype = record_dtype(landmark_code)
+        # Ignore a partially written trailing record (e.g. after a crash)
+        count = (os.path.getsize(path) - HEADER_SIZE) // self.dtype.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r",
+                                     offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+        # Index of the first record of every frame
+        frames = self.records["frame"]
+        self.frame_starts = np.concatenate(([0], np.flatnonzero(np.diff(frames)) + 1)) if count else np.zeros(0, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.frame_starts)
+
+    def arrays(self, max_hands=2):
+        """Whole recording as (timestamps (T,), landmarks (T, max_hands, 21, 2),
+        handedness (T, max_hands)); missing hands are HAND_NONE with zero landmarks.
+        """
+        count = len(self.frame_starts)
+        timestamps = np.asarray(self.records["timestamp"][self.frame_starts], dtype=np.float64)
+        landmarks = np.zeros((count, max_hands, NUM_LANDMARKS, 2), dtype=self.records.dtype["landmarks"].base)
+        handedness = np.full((count, max_hands), HAND_NONE, dtype=np.uint8)
+        if count:
+            # Frame and slot of every record: slot = position within its frame
+            frame_of = np.repeat(np.arange(count), np.diff(np.append(self.frame_starts, len(self.records))))
+            slot = np.arange(len(self.records)) - self.frame_starts[frame_of]
+            keep = slot < max_hands
+            landmarks[frame_of[keep], slot[keep]] = self.records["landmarks"][keep]
+            handedness[frame_of[keep], slot[keep]] = self.records["hand"][keep]
+        return timestamps, landmarks, handedness
+
+    def frames(self):
+        """Yield (timestamp, landmarks, handedness) per frame.
+
+        Same shapes as HandDetector.findHandsArray; the arrays are views
+        into the memory map, not copies.
+        """
+        timestamps = self.records["timestamp"]
+        hands = self.records["hand"]
+        landmarks = self.records["landmarks"]
+        ends = np.append(self.frame_starts[1:], len(self.records))
+        for start, end in zip(self.frame_starts, ends):
+            if hands[start] == HAND_NONE:
+                end = start  # Empty frame: zero-length views
+            yield float(timestamps[start]), landmarks[start:end], hands[start:end]
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Launch-time measurement for Air-Piano builds
+Starts the app headless on synthetic frames, lets it quit as soon as the
+first frame is read, and reports cold and warm launch times. Before the
+cold run, every file of the build is evicted from the OS page cache
+(posix_fadvise DONTNEED on Linux/macOS; no root needed). On Windows the
+first run only counts as cold if nothing has touched the files since boot.
+
+    python measure_launch.py dist/Air-Piano/Air-Piano       # onedir build
+    python measure_launch.py dist/Air-Piano.exe --runs 10   # onefile build
+    python measure_launch.py --source-run                   # plain Python, for comparison
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+APP_ARGS = ["--headless", "--source", "synthetic", "--pacing", "fast", "--exit-after-startup"]
+FIRST_FRAME_RE = re.compile(r"first frame\s+[\d.]+\s*->\s*([\d.]+)\s*s")
+
+
+def evict_from_page_cache(paths):
+    """Drop cached pages of every file under paths; returns how many files were evicted"""
+    if not hasattr(os, "posix_fadvise"):
+        return 0
+    evicted = 0
+    for path in paths:
+        files = [path] if os.path.isfile(path) else \
+            (os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+        for name in files:
+            try:
+                fd = os.open(name, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+                evicted += 1
+            finally:
+                os.close(fd)
+    return evicted
+
+
+def package_dirs(names):
+    """Install directories of packages, found without importing them"""
+    dirs = []
+    for name in names:
+        spec = importlib.util.find_spec(name)
+        if spec is not None and spec.submodule_search_locations:
+            dirs.extend(spec.submodule_search_locations)
+    return dirs
+
+
+def launch(command, timeout):
+    """Run the app once; returns (wall seconds, first-frame seconds reported by the app or None)"""
+    start = time.perf_counter()
+    result = subprocess.run(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, text=True, errors="replace", timeout=timeout)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{command[0]} exited with {result.returncode}:\n{result.stdout[-2000:]}")
+    match = FIRST_FRAME_RE.search(result.stdout)
+    return wall, float(match.group(1)) if match else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Air-Piano cold and warm launch time")
+    parser.add_argument("target", nargs="?", help="packaged executable (onefile or inside a onedir build)")
+    parser.add_argument("--source-run", action="store_true",
+                        help="measure `python air_piano_main.py` instead of a packaged build")
+    parser.add_argument("--runs", type=int, default=5, help="warm launches after the cold one")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", metavar="PATH", help="also write the measurements to this file")
+    args = parser.parse_args()
+
+    if args.source_run:
+        here = os.path.dirname(os.path.abspath(__file__))
+        command = [sys.executable, os.path.join(here, "air_piano_main.py")] + APP_ARGS
+        cache_paths = [here] + package_dirs(["cv2", "mediapipe", "pygame", "numpy", "sounddevice"])
+    elif args.target:
+        target = os.path.abspath(args.target)
+        command = [target] + APP_ARGS
+        # A onedir build loads everything next to the executable
+        folder = os.path.dirname(target)
+        onedir = os.path.isdir(os.path.join(folder, "_internal")) or \
+            os.path.basename(folder) == os.path.splitext(os.path.basename(target))[0]
+        cache_paths = [folder if onedir else target]
+    else:
+        parser.error("give a packaged executable or --source-run")
+
+    evicted = evict_from_page_cache(cache_paths)
+    if evicted:
+        print(f"🧊 Evicted {evicted} files from the page cache")
+    else:
+        print("⚠️ Could not evict the page cache here; the first run is only cold after a reboot")
+    cold = launch(command, args.timeout)
+    print(f"🧊 Cold launch: {cold[0]:.2f} s" + (f" (first frame at {cold[1]:.2f} s)" if cold[1] else ""))
+
+    warm = []
+    for i in range(args.runs):
+        warm.append(launch(command, args.timeout))
+        print(f"🔥 Warm launch {i + 1}: {warm[-1][0]:.2f} s")
+    walls = [w for w, _ in warm]
+    if walls:
+        print(f"📊 Warm launch: median {statistics.median(walls):.2f} s, "
+              f"min {min(walls):.2f} s, max {max(walls):.2f} s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"command": command, "cold_s": cold[0], "cold_first_frame_s": cold[1],
+                       "warm_s": walls, "warm_first_frame_s": [ff for _, ff in warm],
+                       "cache_evicted": bool(evicted)}, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
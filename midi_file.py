@@ -0,0 +1,94 @@
+"""
+Standard MIDI File writing for Air-Piano
+Writes a single-track (format 0) .mid file. Events can be added a few at a
+time: every flush() appends them before a fresh End-of-Track and patches
+the track length, so the file on disk is complete after each flush.
+
+Times are in seconds. With the default 1000 ticks per quarter note at
+1,000,000 us per quarter, one tick is one millisecond, and ticks are
+rounded from absolute times, so rounding never accumulates.
+"""
+
+import struct
+from midi_output import NOTE_ON, NOTE_OFF
+
+PPQ = 1000            # Ticks per quarter note
+TEMPO = 1000000       # Microseconds per quarter note (60 BPM)
+END_OF_TRACK = b"\x00\xff\x2f\x00"
+
+
+def vlq(value):
+    """MIDI variable-length quantity"""
+    out = bytearray([value & 0x7F])
+    value >>= 7
+    while value:
+        out.insert(0, 0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(out)
+
+
+class MidiFileWriter:
+    """Incrementally written single-track Standard MIDI File.
+
+        with MidiFileWriter("session.mid") as midi:
+            midi.note_on(0.0, 62, 127)
+            midi.note_off(0.5, 62)
+            midi.flush()   # File is valid on disk from here on
+    """
+    def __init__(self, path, ppq=PPQ, tempo=TEMPO):
+        self.path = path
+        self.ticks_per_second = ppq * 1000000 / tempo
+        self.file = open(path, "wb")
+        self.file.write(b"MThd" + struct.pack(">IHHH", 6, 0, 1, ppq))
+        self.track_start = self.file.tell() + 8  # First byte after "MTrk" + length
+        self.file.write(b"MTrk" + struct.pack(">I", 0))
+        self.data_end = self.track_start
+        self.buffer = bytearray(b"\x00\xff\x51\x03" + tempo.to_bytes(3, "big"))  # Set Tempo meta event
+        self.last_tick = 0
+        self.flush()
+
+    def add(self, time, status, data1, data2):
+        """Queue one channel message at `time` seconds (earlier times are clamped to the last event)"""
+        tick = max(self.last_tick, round(time * self.ticks_per_second))
+        self.buffer += vlq(tick - self.last_tick)
+        self.buffer += bytes((status, data1, data2))
+        self.last_tick = tick
+
+    def note_on(self, time, note, velocity=127, channel=0):
+        self.add(time, NOTE_ON | channel, note, velocity)
+
+    def note_off(self, time, note, velocity=127, channel=0):
+        self.add(time, NOTE_OFF | channel, note, velocity)
+
+    def add_events(self, events):
+        """Queue a GestureEngine EVENT_DTYPE array (already sorted by time)"""
+        for time, note, velocity, on, channel in events.tolist():
+            self.add(time, (NOTE_ON if on else NOTE_OFF) | channel, note, velocity)
+
+    def flush(self):
+        """Append queued events, rewrite End-of-Track and patch the track length"""
+        self.file.seek(self.data_end)
+        self.file.write(self.buffer)
+        self.file.write(END_OF_TRACK)
+        self.data_end += len(self.buffer)
+        self.file.seek(self.track_start - 4)
+        self.file.write(struct.pack(">I", self.data_end + len(END_OF_TRACK) - self.track_start))
+        self.file.flush()
+        self.buffer.clear()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_midi_file(path, events, ppq=PPQ, tempo=TEMPO):
+    """Write a GestureEngine event array to a .mid file in one go"""
+    with MidiFileWriter(path, ppq, tempo) as midi:
+        midi.add_events(events)
@@ -0,0 +1,117 @@
+"""
+Batched MIDI output for Air-Piano
+Note events produced during one frame are collected and sent with a
+single timestamped write instead of one synchronous call per note.
+"""
+
+import threading
+import time
+
+NOTE_ON = 0x90
+NOTE_OFF = 0x80
+MAX_EVENTS_PER_WRITE = 1024  # pygame.midi.Output.write limit
+
+
+class MidiBackend:
+    """Destination for batches of timestamped MIDI messages.
+
+    Events use the pygame.midi format: [[status, data1, data2], timestamp_ms].
+    """
+    def time(self):
+        """Current backend clock in milliseconds"""
+        raise NotImplementedError
+
+    def write(self, events):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PygameMidiBackend(MidiBackend):
+    """pygame.midi output port (e.g. loopMIDI or a hardware synth).
+
+    With latency_ms > 0 PortMidi plays each event at its timestamp plus the
+    latency, so onsets stay evenly spaced even if a batch is sent late.
+    """
+    def __init__(self, device_id=0, latency_ms=10, instrument=0):
+        import pygame.midi
+        self._midi = pygame.midi
+        self.output = pygame.midi.Output(device_id, latency=latency_ms)
+        self.output.set_instrument(instrument)  # 0 = Acoustic Grand Piano
+
+    def time(self):
+        return self._midi.time()
+
+    def write(self, events):
+        for start in range(0, len(events), MAX_EVENTS_PER_WRITE):
+            self.output.write(events[start:start + MAX_EVENTS_PER_WRITE])
+
+    def close(self):
+        self.output.close()
+
+
+class MemoryMidiBackend(MidiBackend):
+    """In-memory stand-in that keeps every batch; for tests and headless runs"""
+    def __init__(self):
+        self.batches = []
+        self._start = time.perf_counter()
+
+    def time(self):
+        return int((time.perf_counter() - self._start) * 1000)
+
+    def write(self, events):
+        self.batches.append(list(events))
+
+    @property
+    def events(self):
+        return [event for batch in self.batches for event in batch]
+
+
+class MidiOutput:
+    """Collects note events and sends them to a backend in batches.
+
+    note_on()/note_off() only queue the event, stamped with the backend
+    clock at the time of the call; flush() sends everything queued so far
+    in one write. Safe to use from the frame loop and the scheduler thread.
+    """
+    def __init__(self, backend, channel=0):
+        self.backend = backend
+        self.channel = channel
+        self._pending = []
+        self._lock = threading.Lock()        # Guards _pending; never held during a write
+        self._write_lock = threading.Lock()  # One backend write at a time, batches in order
+        self.recorder = None  # Optional SessionRecorder that gets a copy of every event
+
+    def _queue(self, status, note, velocity, channel):
+        channel = self.channel if channel is None else channel
+        event = [[status | channel, note, velocity], self.backend.time()]
+        with self._lock:
+            self._pending.append(event)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(status | channel, note, velocity)
+
+    def note_on(self, note, velocity=127, channel=None):
+        self._queue(NOTE_ON, note, velocity, channel)
+
+    def note_off(self, note, velocity=127, channel=None):
+        self._queue(NOTE_OFF, note, velocity, channel)
+
+    def flush(self):
+        """Send all queued events in one batch. Returns how many were sent.
+
+        Both the frame loop and the scheduler thread flush; backends such as
+        PortMidi are not thread-safe, so writes are serialized, and the
+        batch is taken under the same lock so batches reach it in order.
+        """
+        with self._write_lock:
+            with self._lock:
+                events, self._pending = self._pending, []
+            if events:
+                self.backend.write(events)
+        return len(events)
+
+    def close(self):
+        self.flush()
+        self.backend.close()
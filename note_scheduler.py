@@ -0,0 +1,117 @@
+"""
+Delayed event scheduler for Air-Piano
+One background thread owns every pending note-off, so the thread count
+stays constant no matter how fast someone plays.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+
+class NoteScheduler:
+    """Heap-based timer that runs callbacks after a delay.
+
+    Every pending event has a key (e.g. ("left", "thumb")). Scheduling a
+    key that is already pending replaces it, and cancel() removes it, so a
+    finger raised again inside the sustain window can keep its chord.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []       # (due, seq, key); stale entries are skipped lazily
+        self._pending = {}    # key -> (due, seq, callback, args)
+        self._seq = itertools.count()
+        self._thread = None
+        self._running = False
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="NoteScheduler", daemon=True)
+            self._thread.start()
+
+    def schedule(self, key, delay, callback, *args):
+        """Run callback(*args) after delay seconds, replacing any pending event for key"""
+        with self._cond:
+            self._ensure_started()
+            due = time.perf_counter() + delay
+            seq = next(self._seq)
+            self._pending[key] = (due, seq, callback, args)
+            heapq.heappush(self._heap, (due, seq, key))
+            if len(self._heap) > 4 * len(self._pending) + 64:
+                # Many replaced/cancelled entries: rebuild from the live ones
+                self._heap = [(d, s, k) for k, (d, s, _, _) in self._pending.items()]
+                heapq.heapify(self._heap)
+            self._cond.notify()
+
+    def cancel(self, key):
+        """Drop the pending event for key. Returns True if one was pending."""
+        with self._cond:
+            return self._pending.pop(key, None) is not None
+
+    def reschedule(self, key, delay):
+        """Move a pending event to delay seconds from now. Returns False if none is pending."""
+        with self._cond:  # Held across schedule() (an RLock) so the event cannot fire in between
+            entry = self._pending.get(key)
+            if entry is None:
+                return False
+            _, _, callback, args = entry
+            self.schedule(key, delay, callback, *args)
+        return True
+
+    def is_pending(self, key):
+        with self._cond:
+            return key in self._pending
+
+    def __len__(self):
+        with self._cond:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    # Discard heap entries that were cancelled or replaced
+                    while self._heap and self._is_stale(self._heap[0]):
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - time.perf_counter()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if not self._running:
+                    return
+                _, _, key = heapq.heappop(self._heap)
+                _, _, callback, args = self._pending.pop(key)
+            # Run outside the lock so callbacks may schedule or cancel
+            self._call(key, callback, args)
+
+    @staticmethod
+    def _call(key, callback, args):
+        """Run one event; a failing callback must not take the timer thread down"""
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"⚠️ Scheduled event {key!r} failed: {e!r}")
+
+    def _is_stale(self, entry):
+        pending = self._pending.get(entry[2])
+        return pending is None or pending[1] != entry[1]
+
+    def stop(self, run_pending=True):
+        """Stop the thread; by default fire every pending event immediately"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            pending = sorted(self._pending.items(), key=lambda item: item[1][:2])
+            self._pending.clear()
+            self._heap.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if run_pending:
+            for key, (_, _, callback, args) in pending:
+                self._call(key, callback, args)
@@ -0,0 +1,295 @@
+"""
+Sample-based piano for Air-Piano
+Plays a directory of WAV piano samples. Files are memory-mapped rather
+than decoded at startup, notes without a sample are pitch-shifted from the
+nearest one, and the resampled notes live in a size-bounded LRU cache.
+Notes that are not ready yet are resampled on a background thread and
+pitch-shifted block by block while they play, so a note-on never waits.
+"""
+
+import os
+import queue
+import re
+import struct
+import threading
+from collections import OrderedDict
+import numpy as np
+
+from soft_synth import Instrument
+
+NOTE_OFFSETS = {"C": 0, "D": 2, "E": 4, "F": 5, "G": 7, "A": 9, "B": 11}
+NOTE_NAME_RE = re.compile(r"(?<![A-Za-z])([A-G])([#sb]?)(-?\d)(?!\d)")
+NOTE_NUMBER_RE = re.compile(r"(\d{1,3})(?!.*\d)")
+
+
+def note_from_filename(name):
+    """MIDI note from a sample file name: "C4.wav", "F#3.wav", "Db5.wav" or "60.wav"."""
+    stem = os.path.splitext(name)[0]
+    match = NOTE_NAME_RE.search(stem)
+    if match:
+        letter, accidental, octave = match.groups()
+        shift = {"#": 1, "s": 1, "b": -1}.get(accidental, 0)
+        return 12 * (int(octave) + 1) + NOTE_OFFSETS[letter] + shift
+    match = NOTE_NUMBER_RE.search(stem)
+    if match and 0 <= int(match.group(1)) <= 127:
+        return int(match.group(1))
+    return None
+
+
+def map_wav(path):
+    """Memory-map the PCM data of a 16-bit WAV file.
+
+    Returns (samples, sample_rate) where samples is a read-only int16
+    (frames, channels) memmap; nothing is decoded until it is read.
+    """
+    with open(path, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"Not a WAV file: {path}")
+        channels = sample_rate = bits = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"No data chunk in: {path}")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = f.read(size)
+                audio_format, channels, sample_rate = struct.unpack("<HHI", fmt[:8])
+                bits = struct.unpack("<H", fmt[14:16])[0]
+                if audio_format != 1 or bits != 16:
+                    raise ValueError(f"Only 16-bit PCM WAV is supported: {path}")
+            elif chunk_id == b"data":
+                if channels is None:
+                    raise ValueError(f"Missing fmt chunk in: {path}")
+                frames = size // (2 * channels)
+                samples = np.memmap(path, dtype="<i2", mode="r", offset=f.tell(),
+                                    shape=(frames, channels))
+                return samples, sample_rate
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)  # Chunks are word-aligned
+
+
+class SampleBank:
+    """Lazily loaded piano samples keyed by MIDI note.
+
+    get(note) returns a (frames, channels) array at the output sample rate:
+    the memory map itself when a sample exists for that note at the right
+    rate, otherwise a float32 variant resampled from the nearest sample.
+    Resampled variants are kept in an LRU cache of at most max_cache_bytes.
+    lookup(note) never resamples: on a miss it returns the nearest sample
+    and the playback step that pitch-shifts it, and queues the variant for
+    the background resampler.
+    """
+    def __init__(self, directory, sample_rate=44100, max_cache_bytes=64 * 1024 * 1024):
+        self.sample_rate = sample_rate
+        self.max_cache_bytes = max_cache_bytes
+        self.paths = {}
+        for name in sorted(os.listdir(directory)):
+            if name.lower().endswith(".wav"):
+                note = note_from_filename(name)
+                if note is not None:
+                    self.paths[note] = os.path.join(directory, name)
+        if not self.paths:
+            raise IOError(f"No note-named WAV samples found in: {directory}")
+        self.sampled_notes = np.array(sorted(self.paths))
+        self._mapped = {}               # note -> (memmap, sample_rate)
+        self._cache = OrderedDict()     # note -> resampled float32 array
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+        self._requests = queue.Queue()  # Notes waiting for the background resampler
+        self._requested = set()
+        self._worker = None
+
+    def _mapped_sample(self, note):
+        if note not in self._mapped:
+            self._mapped[note] = map_wav(self.paths[note])
+        return self._mapped[note]
+
+    def nearest_sample(self, note):
+        return int(self.sampled_notes[np.argmin(np.abs(self.sampled_notes - note))])
+
+    def _ready(self, note):
+        """Playable array for note if one exists without resampling (lock held)"""
+        if note in self.paths:
+            samples, rate = self._mapped_sample(note)
+            if rate == self.sample_rate:
+                return samples
+        cached = self._cache.get(note)
+        if cached is not None:
+            self._cache.move_to_end(note)
+        return cached
+
+    def _source(self, note):
+        """(samples, rate, pitch ratio) of the sample a note is shifted from (lock held)"""
+        source = note if note in self.paths else self.nearest_sample(note)
+        samples, rate = self._mapped_sample(source)
+        return samples, rate, 2.0 ** ((note - source) / 12.0)
+
+    def get(self, note):
+        """Playable array for note, resampling it now if needed"""
+        with self._lock:
+            ready = self._ready(note)
+            if ready is not None:
+                return ready
+            samples, rate, pitch_ratio = self._source(note)
+        variant = self._resample(samples, rate, pitch_ratio)  # Outside the lock: lookup() never waits
+        with self._lock:
+            if note not in self._cache:
+                self._cache[note] = variant
+                self._cache_bytes += variant.nbytes
+            while self._cache_bytes > self.max_cache_bytes and len(self._cache) > 1:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted.nbytes
+            return self._cache.get(note, variant)
+
+    def lookup(self, note):
+        """(samples, step) for note without resampling.
+
+        step is 1.0 for a ready array; on a miss samples is the nearest
+        source sample, step the playback rate that pitch-shifts it, and the
+        exact variant is queued for the background resampler.
+        """
+        with self._lock:
+            ready = self._ready(note)
+            if ready is not None:
+                return ready, 1.0
+            samples, rate, pitch_ratio = self._source(note)
+        self.preload_async([note])
+        return samples, pitch_ratio * rate / self.sample_rate
+
+    def _resample(self, samples, rate, pitch_ratio):
+        """Linear-interpolation resample; pitch_ratio > 1 plays faster and higher"""
+        step = pitch_ratio * rate / self.sample_rate
+        frames = int(len(samples) / step)
+        positions = np.arange(frames) * step
+        source = np.arange(len(samples))
+        out = np.empty((frames, samples.shape[1]), dtype=np.float32)
+        for ch in range(samples.shape[1]):
+            out[:, ch] = np.interp(positions, source, samples[:, ch]) / 32768.0
+        return out
+
+    def preload(self, notes):
+        """Map or resample the given notes ahead of time (e.g. every chord note)"""
+        for note in notes:
+            self.get(note)
+
+    def preload_async(self, notes):
+        """Queue notes for the background resampler and return at once"""
+        with self._lock:
+            for note in notes:
+                if note not in self._requested:
+                    self._requested.add(note)
+                    self._requests.put(note)
+            if self._worker is None and self._requested:
+                self._worker = threading.Thread(target=self._resample_loop, name="sample-resampler",
+                                                daemon=True)
+                self._worker.start()
+
+    def _resample_loop(self):
+        while True:
+            note = self._requests.get()
+            self.get(note)
+            with self._lock:
+                self._requested.discard(note)
+
+    @property
+    def cache_bytes(self):
+        return self._cache_bytes
+
+
+class SamplePiano(Instrument):
+    """Plays SampleBank notes with a short release fade and voice stealing.
+
+    Same note_on/note_off/render interface as SoftSynth, so it plugs into
+    SynthMidiBackend and the chord triggers unchanged.
+    """
+    def __init__(self, bank, block_size=256, max_voices=32, release=0.4, gain=0.5):
+        self.bank = bank
+        self.sample_rate = bank.sample_rate
+        self.block_size = block_size
+        self.max_voices = max_voices
+        self.release = release
+        self.gain = gain
+        self._lock = threading.Lock()
+        self._voices = []  # [note, samples, position, velocity, release_pos or -1, step]
+
+    @property
+    def tail_time(self):
+        return self.release
+
+    @property
+    def active_voices(self):
+        return len(self._voices)
+
+    def note_on(self, note, velocity=127):
+        samples, step = self.bank.lookup(note)  # Never resamples; misses are pitch-shifted per block
+        with self._lock:
+            for voice in self._voices:
+                if voice[0] == note and voice[4] < 0:
+                    voice[4] = 0  # Release the previous strike of this note
+            if len(self._voices) >= self.max_voices:
+                self._voices.pop(0)  # Steal the oldest voice
+            self._voices.append([note, samples, 0, velocity / 127.0, -1, step])
+
+    def note_off(self, note, velocity=0):
+        with self._lock:
+            for voice in self._voices:
+                if voice[0] == note and voice[4] < 0:
+                    voice[4] = 0
+
+    def all_notes_off(self):
+        with self._lock:
+            for voice in self._voices:
+                if voice[4] < 0:
+                    voice[4] = 0
+
+    @staticmethod
+    def _shifted_block(samples, pos, step, frames):
+        """Up to `frames` frames read at `step` source frames per output frame from pos"""
+        positions = pos + step * np.arange(frames)
+        n = int(np.searchsorted(positions, len(samples) - 1))
+        if not n:
+            return np.zeros((0, samples.shape[1]), dtype=np.float32), 0
+        first = int(positions[0])
+        window = samples[first:int(positions[n - 1]) + 2]
+        local = positions[:n] - first
+        index = np.arange(len(window))
+        block = np.empty((n, samples.shape[1]), dtype=np.float32)
+        for ch in range(samples.shape[1]):
+            block[:, ch] = np.interp(local, index, window[:, ch])
+        return block, n
+
+    def render(self, frames):
+        out = np.zeros((frames, 2), dtype=np.float32)
+        release_frames = max(int(self.release * self.sample_rate), 1)
+        ramp = np.arange(frames, dtype=np.float32)
+        with self._lock:
+            voices = list(self._voices)
+        finished = []
+        for voice in voices:
+            note, samples, pos, velocity, release_pos, step = voice
+            if step == 1.0:
+                block = samples[pos:pos + frames].astype(np.float32)
+                n = len(block)
+            else:
+                block, n = self._shifted_block(samples, pos, step, frames)
+            if n:
+                if samples.dtype == np.int16:
+                    block *= 1.0 / 32768.0
+                gain = velocity * self.gain
+                if release_pos >= 0:
+                    env = np.clip(1.0 - (release_pos + ramp[:n]) / release_frames, 0.0, 1.0)
+                    block *= (env * gain)[:, None]
+                    voice[4] = release_pos + n
+                else:
+                    block *= gain
+                out[:n] += block[:, :2]  # Mono samples broadcast to both channels
+            voice[2] = pos + n if step == 1.0 else pos + n * step  # Fractional only while shifting
+            if n < frames or (release_pos >= 0 and voice[4] >= release_frames):
+                finished.append(voice)
+        if finished:
+            done = {id(v) for v in finished}
+            with self._lock:
+                self._voices = [v for v in self._voices if id(v) not in done]
+        np.clip(out, -1.0, 1.0, out=out)
+        return out
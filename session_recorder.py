@@ -0,0 +1,68 @@
+"""
+Live session recording for Air-Piano
+Every note event sent through MidiOutput is timestamped and appended to an
+in-memory deque (a single atomic append, no lock, never touches the disk);
+a background thread drains it into a .mid file every flush_interval
+seconds. Each flush leaves a complete, playable file on disk, so a crash
+loses at most the last interval.
+"""
+
+import collections
+import os
+import threading
+import time
+from midi_file import MidiFileWriter, PPQ, TEMPO
+
+
+class SessionRecorder:
+    """Records note events from any thread into a MIDI file written in the background.
+
+        recorder = SessionRecorder("session.mid").start()
+        midi_out.recorder = recorder
+        ...
+        recorder.stop()
+    """
+    def __init__(self, path, flush_interval=1.0, ppq=PPQ, tempo=TEMPO):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.writer = MidiFileWriter(path, ppq, tempo)
+        self.queue = collections.deque()  # append/popleft are atomic, so producers never wait
+        self.start_time = time.perf_counter()
+        self.events_written = 0
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.thread.start()
+        return self
+
+    def record(self, status, data1, data2):
+        """Queue one MIDI message stamped with the current time; safe from any thread"""
+        self.queue.append((time.perf_counter() - self.start_time, status, data1, data2))
+
+    def _drain(self):
+        """Move everything queued so far into the file and flush it to disk"""
+        count = 0
+        queue = self.queue
+        while queue:
+            self.writer.add(*queue.popleft())
+            count += 1
+        if count:
+            self.writer.flush()
+            os.fsync(self.writer.file.fileno())
+            self.events_written += count
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self._drain()
+        self._drain()
+
+    def stop(self):
+        """Write what is still queued and close the file"""
+        self._stop.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        else:
+            self._drain()
+        self.writer.close()
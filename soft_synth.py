@@ -0,0 +1,286 @@
+"""
+Built-in polyphonic software synthesizer for Air-Piano
+Renders every active voice in NumPy blocks inside a sounddevice callback,
+so no external MIDI synth (loopMIDI etc.) is needed. The same engine can
+render offline to a WAV file for headless testing.
+"""
+
+import collections
+import threading
+import time
+import wave
+import numpy as np
+
+from midi_output import MidiBackend, NOTE_ON, NOTE_OFF
+from tone_bank import midi_to_frequency
+
+
+class ADSR:
+    """Linear attack/decay/release envelope; times in seconds, sustain as a level"""
+    def __init__(self, attack=0.01, decay=0.3, sustain=0.6, release=1.2):
+        self.attack = attack
+        self.decay = decay
+        self.sustain = sustain
+        self.release = release
+
+
+class Instrument:
+    """Base for block-rendered instruments played through sounddevice.
+
+    Subclasses implement note_on(), note_off() and render(frames); this
+    class provides the audio stream and offline rendering.
+    """
+    sample_rate = 44100
+    block_size = 256
+    _stream = None
+
+    @property
+    def tail_time(self):
+        """Seconds of sound that may follow the last note-off"""
+        return 0.0
+
+    # --- Real-time output ---
+
+    def _callback(self, outdata, frames, time_info, status):
+        outdata[:] = self.render(frames)
+
+    def start(self, device=None):
+        """Open a low-latency sounddevice output stream"""
+        import sounddevice as sd
+        self._stream = sd.OutputStream(
+            samplerate=self.sample_rate, blocksize=self.block_size, channels=2,
+            dtype="float32", latency="low", device=device, callback=self._callback,
+        )
+        self._stream.start()
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    # --- Offline rendering ---
+
+    def render_events(self, events, duration=None):
+        """Render (time_s, note, velocity, is_on) events offline.
+
+        Events are applied at the start of the block containing them, exactly
+        as in real time. Returns a float32 (frames, 2) array.
+        """
+        events = sorted(events, key=lambda e: e[0])
+        if duration is None:
+            last = events[-1][0] if events else 0.0
+            duration = last + self.tail_time + 0.1
+        total = int(duration * self.sample_rate)
+        audio = np.zeros((total, 2), dtype=np.float32)
+        i = 0
+        for start in range(0, total, self.block_size):
+            block_end = (start + self.block_size) / self.sample_rate
+            while i < len(events) and events[i][0] < block_end:
+                _, note, velocity, is_on = events[i]
+                (self.note_on if is_on else self.note_off)(note, velocity)
+                i += 1
+            frames = min(self.block_size, total - start)
+            audio[start:start + frames] = self.render(frames)
+        return audio
+
+
+class SoftSynth(Instrument):
+    """Polyphonic additive-sine synth with ADSR envelopes and voice stealing.
+
+    note_on()/note_off() may be called from any thread; they only queue a
+    command that the audio thread applies at the start of the next block.
+    Voice state is kept as parallel NumPy arrays so a block of every voice
+    is rendered with a handful of array operations.
+    """
+    def __init__(self, sample_rate=44100, block_size=256, max_voices=24,
+                 envelope=None, harmonics=(1.0, 0.4, 0.2, 0.1), gain=0.15):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.max_voices = max_voices
+        self.envelope = envelope or ADSR()
+        self.harmonics = np.asarray(harmonics, dtype=np.float64) / sum(harmonics)
+        self.gain = gain
+        self._commands = collections.deque()  # Appends/pops are thread-safe
+
+        n = max_voices
+        self.note = np.full(n, -1, dtype=np.int32)     # -1 = free voice
+        self.omega = np.zeros(n)                        # Radians per sample
+        self.phase = np.zeros(n)
+        self.velocity = np.zeros(n)
+        self.t_on = np.zeros(n, dtype=np.int64)         # Samples since note-on
+        self.t_off = np.full(n, -1, dtype=np.int64)     # Samples since note-off, -1 while held
+        self.start_level = np.zeros(n)                  # Envelope level at (re)trigger
+        self.release_level = np.zeros(n)                # Envelope level at note-off
+
+    # --- Control (any thread) ---
+
+    def note_on(self, note, velocity=127):
+        self._commands.append((True, note, velocity))
+
+    def note_off(self, note, velocity=0):
+        self._commands.append((False, note, velocity))
+
+    def all_notes_off(self):
+        for note in self.note[self.note >= 0]:
+            self.note_off(int(note))
+
+    @property
+    def active_voices(self):
+        return int(np.count_nonzero(self.note >= 0))
+
+    @property
+    def tail_time(self):
+        return self.envelope.release
+
+    # --- Audio thread ---
+
+    def _held_level(self, t, start):
+        """Envelope level of held voices t samples after note-on"""
+        env = self.envelope
+        a = max(env.attack * self.sample_rate, 1.0)
+        d = max(env.decay * self.sample_rate, 1.0)
+        attack = start + (1.0 - start) * t / a
+        decay = 1.0 - (1.0 - env.sustain) * (t - a) / d
+        return np.where(t < a, attack, np.where(t < a + d, decay, env.sustain))
+
+    def _current_level(self, v):
+        if self.t_off[v] >= 0:
+            r = max(self.envelope.release * self.sample_rate, 1.0)
+            return max(self.release_level[v] * (1.0 - self.t_off[v] / r), 0.0)
+        return float(self._held_level(np.float64(self.t_on[v]), self.start_level[v]))
+
+    def _steal_voice(self):
+        free = np.flatnonzero(self.note < 0)
+        if len(free):
+            return free[0]
+        released = np.flatnonzero(self.t_off >= 0)
+        if len(released):
+            # The voice furthest into its release is the quietest
+            return released[np.argmax(self.t_off[released])]
+        return int(np.argmax(self.t_on))  # Oldest held voice
+
+    def _apply_commands(self):
+        while self._commands:
+            is_on, note, velocity = self._commands.popleft()
+            voices = np.flatnonzero(self.note == note)
+            if is_on:
+                # Retrigger a voice already playing this note instead of doubling it
+                v = voices[0] if len(voices) else self._steal_voice()
+                level = self._current_level(v) if self.note[v] >= 0 else 0.0
+                if self.note[v] != note:
+                    self.phase[v] = 0.0
+                self.note[v] = note
+                self.omega[v] = 2 * np.pi * midi_to_frequency(note) / self.sample_rate
+                self.velocity[v] = velocity / 127.0
+                self.t_on[v] = 0
+                self.t_off[v] = -1
+                self.start_level[v] = level
+            else:
+                for v in voices:
+                    if self.t_off[v] < 0:
+                        self.release_level[v] = self._current_level(v)
+                        self.t_off[v] = 0
+
+    def render(self, frames):
+        """Render the next block as a float32 (frames, 2) array"""
+        self._apply_commands()
+        out = np.zeros((frames, 2), dtype=np.float32)
+        active = np.flatnonzero(self.note >= 0)
+        if not len(active):
+            return out
+
+        n = np.arange(frames, dtype=np.float64)
+        t_on = self.t_on[active, None] + n
+        env = self._held_level(t_on, self.start_level[active, None])
+        releasing = self.t_off[active] >= 0
+        if releasing.any():
+            r = max(self.envelope.release * self.sample_rate, 1.0)
+            t_off = self.t_off[active, None] + n
+            fade = np.clip(self.release_level[active, None] * (1.0 - t_off / r), 0.0, None)
+            env = np.where(releasing[:, None], fade, env)
+
+        phase = self.phase[active, None] + self.omega[active, None] * n
+        wave_sum = np.zeros_like(phase)
+        for k, amp in enumerate(self.harmonics, start=1):
+            wave_sum += amp * np.sin(k * phase)
+        mono = (wave_sum * env * self.velocity[active, None]).sum(axis=0) * self.gain
+        np.tanh(mono, out=mono)  # Soft clip when many voices stack up
+        out[:, 0] = mono
+        out[:, 1] = mono
+
+        # Advance voice state
+        self.phase[active] = (self.phase[active] + self.omega[active] * frames) % (2 * np.pi)
+        self.t_on[active] += frames
+        self.t_off[active[releasing]] += frames
+        r = self.envelope.release * self.sample_rate
+        finished = active[releasing & (self.t_off[active] >= r)]
+        self.note[finished] = -1
+        return out
+
+
+def write_wav(path, audio, sample_rate=44100):
+    """Write a float (frames, channels) array as 16-bit PCM WAV"""
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(pcm.shape[1])
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+
+
+class SynthMidiBackend(MidiBackend):
+    """MidiBackend that drives a SoftSynth or any other Instrument.
+
+    Instruments have one voice per note and no MIDI channels, so the
+    backend tracks which channels hold each note: the note starts when the
+    first channel presses it and stops only when the last one lets go, and
+    hands on different channels never cut off or re-attack each other.
+    """
+    def __init__(self, synth):
+        self.synth = synth
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._held = {}  # note -> set of channels holding it
+
+    def time(self):
+        return int((time.perf_counter() - self._start) * 1000)
+
+    def write(self, events):
+        with self._lock:
+            for (status, note, velocity), _ in events:
+                kind, channel = status & 0xF0, status & 0x0F
+                channels = self._held.get(note)
+                if kind == NOTE_ON and velocity > 0:
+                    if channels is None:
+                        self._held[note] = {channel}
+                        self.synth.note_on(note, velocity)
+                    else:
+                        channels.add(channel)
+                elif kind in (NOTE_ON, NOTE_OFF) and channels is not None:
+                    channels.discard(channel)
+                    if not channels:
+                        del self._held[note]
+                        self.synth.note_off(note, velocity)
+
+    def close(self):
+        self.synth.stop()
+
+
+if __name__ == "__main__":
+    # Headless check: render the five D-major finger chords to a WAV file
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "synth_test.wav"
+    chord_notes = [[62, 66, 69], [64, 67, 71], [66, 69, 73], [67, 71, 74], [69, 73, 76]]
+    events = []
+    for i, notes in enumerate(chord_notes):
+        for note in notes:
+            events.append((i * 0.6, note, 127, True))
+            events.append((i * 0.6 + 0.4, note, 0, False))
+    synth = SoftSynth()
+    start = time.perf_counter()
+    audio = synth.render_events(events)
+    elapsed = time.perf_counter() - start
+    write_wav(path, audio, synth.sample_rate)
+    print(f"✅ Rendered {len(audio) / synth.sample_rate:.1f}s of audio in {elapsed * 1000:.0f} ms -> {path}")
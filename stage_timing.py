@@ -0,0 +1,183 @@
+"""
+Per-stage latency instrumentation for Air-Piano
+Each stage of the frame loop (capture, flip, colour conversion, inference,
+chord dispatch, MIDI emit, drawing ...) records its duration into a rolling
+window. Percentiles and log-spaced histograms are computed only when the
+overlay or a dump asks for them; a disabled timer costs one attribute check.
+"""
+
+import csv
+import json
+import os
+import time
+import numpy as np
+
+# Histogram buckets: 0.01 ms .. 1 s, log-spaced (10 per decade)
+HISTOGRAM_EDGES_MS = np.round(np.logspace(-2, 3, 51), 4)
+PERCENTILES = (50, 95, 99)
+
+
+class RollingStats:
+    """The last `window` durations of one stage, in milliseconds"""
+    def __init__(self, window=1024):
+        self.samples = np.zeros(window)
+        self.count = 0  # Samples ever recorded
+
+    def add(self, ms):
+        self.samples[self.count % len(self.samples)] = ms
+        self.count += 1
+
+    @property
+    def recent(self):
+        return self.samples[:min(self.count, len(self.samples))]
+
+    def summary(self):
+        """Dict of count, mean, p50/p95/p99 and max over the window"""
+        recent = self.recent
+        if not len(recent):
+            return {"count": 0}
+        p50, p95, p99 = np.percentile(recent, PERCENTILES)
+        return {"count": self.count, "mean_ms": float(recent.mean()), "p50_ms": float(p50),
+                "p95_ms": float(p95), "p99_ms": float(p99), "max_ms": float(recent.max())}
+
+    def histogram(self):
+        counts, _ = np.histogram(np.clip(self.recent, HISTOGRAM_EDGES_MS[0], HISTOGRAM_EDGES_MS[-1]),
+                                 bins=HISTOGRAM_EDGES_MS)
+        return counts
+
+
+class _Stage:
+    """Reusable context manager that times one stage"""
+    __slots__ = ("stats", "start")
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add((time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+class StageTimer:
+    """Rolling per-stage timings, off by default.
+
+    Two ways to time a stage:
+        with timer.stage("flip"):
+            img = cv2.flip(img, 1)
+    or, for back-to-back stages, mark() once and lap() after each stage:
+        t = timer.mark(); ...; t = timer.lap("fingersUp", t); ...; timer.lap("dispatch", t)
+    Stages are listed in the order they were first recorded.
+    """
+    def __init__(self, enabled=False, window=1024):
+        self.enabled = enabled
+        self.window = window
+        self.stages = {}   # name -> RollingStats
+        self._contexts = {}
+        self.dump_path = None
+        self.dump_interval = 5.0
+        self._last_dump = time.perf_counter()
+
+    def _stats(self, name):
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = RollingStats(self.window)
+        return stats
+
+    def stage(self, name):
+        if not self.enabled:
+            return NULL_STAGE
+        context = self._contexts.get(name)
+        if context is None:
+            context = self._contexts[name] = _Stage(self._stats(name))
+        return context
+
+    def record(self, name, ms):
+        """Add a duration measured elsewhere"""
+        if self.enabled:
+            self._stats(name).add(ms)
+
+    def mark(self):
+        return time.perf_counter() if self.enabled else 0.0
+
+    def lap(self, name, since):
+        """Record the time since `since` under name; returns the new mark"""
+        if not self.enabled:
+            return 0.0
+        now = time.perf_counter()
+        self._stats(name).add((now - since) * 1000)
+        return now
+
+    def summary(self):
+        return {name: stats.summary() for name, stats in self.stages.items()}
+
+    def overlay_lines(self):
+        """One short "stage p50/p95/p99" line per stage, for the on-screen overlay"""
+        lines = []
+        for name, stats in self.stages.items():
+            s = stats.summary()
+            if s["count"]:
+                lines.append(f"{name:<18}{s['p50_ms']:7.2f}{s['p95_ms']:7.2f}{s['p99_ms']:7.2f}")
+        return lines
+
+    # --- Export ---
+
+    def dump(self, path=None):
+        """Write the current window to a .json (snapshot) or .csv (appended rows) file"""
+        path = path or self.dump_path
+        if path.lower().endswith(".csv"):
+            self._dump_csv(path)
+        else:
+            self._dump_json(path)
+
+    def _dump_json(self, path):
+        stages = {}
+        for name, stats in self.stages.items():
+            entry = stats.summary()
+            entry["histogram"] = stats.histogram().tolist()
+            stages[name] = entry
+        data = {"timestamp": time.time(), "window": self.window,
+                "histogram_edges_ms": HISTOGRAM_EDGES_MS.tolist(), "stages": stages}
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)  # Readers never see a half-written file
+
+    def _dump_csv(self, path):
+        fields = ["timestamp", "stage", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+        new_file = not os.path.exists(path)
+        now = time.time()
+        with open(path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            if new_file:
+                writer.writeheader()
+            for name, entry in self.summary().items():
+                if entry["count"]:
+                    writer.writerow({"timestamp": f"{now:.3f}", "stage": name,
+                                     **{k: round(v, 4) if isinstance(v, float) else v
+                                        for k, v in entry.items()}})
+
+    def maybe_dump(self):
+        """Dump to dump_path if dump_interval seconds have passed since the last dump"""
+        if self.enabled and self.dump_path:
+            now = time.perf_counter()
+            if now - self._last_dump >= self.dump_interval:
+                self._last_dump = now
+                self.dump()
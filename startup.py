@@ -0,0 +1,130 @@
+"""
+Parallel startup for Air-Piano
+The slow initialization steps (camera open, MediaPipe graph construction,
+MIDI/synth and mixer init) each run on their own thread while the main
+thread shows progress. Every phase is timed for the startup report.
+"""
+
+import threading
+import time
+import cv2
+import numpy as np
+
+PENDING, RUNNING, DONE, FAILED = "waiting", "running", "ready", "failed"
+
+
+class StartupTask:
+    """One initialization step run on a background thread"""
+    def __init__(self, name, fn, origin):
+        self.name = name
+        self.fn = fn
+        self.origin = origin
+        self.status = PENDING
+        self.value = None
+        self.error = None
+        self.started = None    # Seconds after origin
+        self.finished = None
+        self.thread = threading.Thread(target=self._run, name=f"startup-{name}", daemon=True)
+
+    def _run(self):
+        self.started = time.perf_counter() - self.origin
+        self.status = RUNNING
+        try:
+            self.value = self.fn()
+            self.status = DONE
+        except Exception as e:
+            self.error = e
+            self.status = FAILED
+        self.finished = time.perf_counter() - self.origin
+
+    @property
+    def duration(self):
+        return (self.finished or 0.0) - (self.started or 0.0)
+
+
+class Startup:
+    """Runs startup tasks concurrently and records when each phase ran.
+
+        startup = Startup()
+        startup.add("camera", open_camera)
+        startup.start()
+        startup.wait(on_progress=show)
+        cap = startup.result("camera")
+    """
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.tasks = {}
+        self.phases = []  # (name, start, end) measured on the calling thread
+
+    def add(self, name, fn):
+        self.tasks[name] = StartupTask(name, fn, self.origin)
+        return self.tasks[name]
+
+    def start(self):
+        for task in self.tasks.values():
+            task.thread.start()
+        return self
+
+    @property
+    def done(self):
+        return all(task.status in (DONE, FAILED) for task in self.tasks.values())
+
+    def wait(self, on_progress=None, interval=0.05):
+        """Block until every task has finished, calling on_progress(self) meanwhile"""
+        while not self.done:
+            if on_progress is not None:
+                on_progress(self)
+            for task in self.tasks.values():
+                if task.thread.is_alive():
+                    task.thread.join(interval)
+                    break
+        if on_progress is not None:
+            on_progress(self)
+
+    def result(self, name):
+        """Value returned by a task; re-raises its exception if it failed"""
+        task = self.tasks[name]
+        if task.error is not None:
+            raise task.error
+        return task.value
+
+    def now(self):
+        return time.perf_counter() - self.origin
+
+    def phase(self, name, start):
+        """Record a phase that ran on the calling thread from `start` until now"""
+        self.phases.append((name, start, self.now()))
+
+    def report(self):
+        """Lines breaking startup down by phase, tasks first, in start order"""
+        rows = [(t.name, t.started or 0.0, t.finished or 0.0, t.status) for t in self.tasks.values()]
+        rows += [(name, start, end, DONE) for name, start, end in self.phases]
+        rows.sort(key=lambda row: row[1])
+        total = max((end for _, _, end, _ in rows), default=0.0)
+        busy = sum(end - start for _, start, end, _ in rows)
+        lines = [f"   {name:<18}{start:6.2f} -> {end:6.2f} s  ({end - start:5.2f} s){'' if status == DONE else '  ' + status}"
+                 for name, start, end, status in rows]
+        lines.append(f"   {'total':<18}{total:6.2f} s wall clock, {busy:.2f} s of work "
+                     f"({busy / total if total else 1.0:.1f}x overlap)")
+        return lines
+
+
+def draw_progress(startup, title, width=640, height=240):
+    """Render the startup progress screen"""
+    img = np.zeros((height, width, 3), dtype=np.uint8)
+    cv2.putText(img, title, (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+    cv2.putText(img, f"Starting... {startup.now():.1f} s", (20, 70), cv2.FONT_HERSHEY_SIMPLEX,
+                0.5, (200, 200, 200), 1)
+    colors = {PENDING: (128, 128, 128), RUNNING: (0, 255, 255), DONE: (0, 255, 0), FAILED: (0, 0, 255)}
+    for i, task in enumerate(startup.tasks.values()):
+        if task.status == RUNNING:
+            detail = f"{startup.now() - task.started:.1f} s"
+        elif task.status in (DONE, FAILED):
+            detail = f"{task.duration:.2f} s"
+        else:
+            detail = ""
+        y = 105 + 25 * i
+        cv2.putText(img, task.name, (40, y), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (255, 255, 255), 1)
+        cv2.putText(img, f"{task.status} {detail}", (260, y), cv2.FONT_HERSHEY_SIMPLEX,
+                    0.55, colors[task.status], 1)
+    return img
@@ -0,0 +1,46 @@
+"""
+Tests for chord_mapping: validation and compiled tables
+"""
+
+import pytest
+
+from chord_mapping import DEFAULT_MAPPING, compile_mapping, default_mapping
+from chord_table import NUM_MASKS
+from gesture_engine import GestureEngine
+
+
+def test_default_mapping_plays_the_original_d_major_chords():
+    mapping = default_mapping()
+    assert mapping.chord("left", "thumb")[:2] == ((62, 66, 69), "D Major")
+    assert mapping.chord("right", "pinky")[:2] == ((69, 73, 76), "A Major")
+    assert len(mapping.combo) == 2 and all(len(table.notes) == NUM_MASKS for table in mapping.combo)
+
+
+def test_high_octave_keeps_combo_notes_in_midi_range():
+    mapping = compile_mapping(dict(DEFAULT_MAPPING, octave=8))
+    notes = [note for table in mapping.combo for chord in table.notes for note in chord]
+    assert max(notes) <= 127
+    # Extensions that would overflow are dropped, the triad stays
+    assert set(mapping.chord("left", "thumb")[0]) <= set(mapping.combo[0].notes[NUM_MASKS - 1])
+    GestureEngine(mapping, mode="combo")  # Used to index past its 128-note table
+
+
+@pytest.mark.parametrize("spec, message", [
+    ({"key": "H", "hands": {"left": {"thumb": 1}}}, "key"),
+    ({"scale": "lydian-ish", "hands": {"left": {"thumb": 1}}}, "scale"),
+    ({"octave": 9, "hands": {"left": {"thumb": 1}}}, "octave"),
+    ({"hands": {"left": {"thumb": "viii"}}}, "roman numeral"),
+    ({"hands": {"left": {"thumb": [60, 128]}}}, "0 to 127"),
+    ({"hands": {"left": {"thumb": {"degree": 1, "notes": [60]}}}}, "exactly one"),
+    ({"hands": {"middle": {}}}, "unknown hands"),
+    ({"hands": {}}, "hands"),
+])
+def test_invalid_mappings_are_rejected(spec, message):
+    with pytest.raises(ValueError, match=message):
+        compile_mapping(spec)
+
+
+def test_mapping_is_read_only():
+    mapping = default_mapping()
+    with pytest.raises(AttributeError):
+        mapping.notes = ()
@@ -0,0 +1,50 @@
+"""
+Tests for ChordTable transitions and combo voicings
+"""
+
+import pytest
+
+from chord_table import NUM_MASKS, ChordTable, combo_voicings
+
+D_MAJOR = [(62, 66, 69), (64, 67, 71), (66, 69, 73), (67, 71, 74), (69, 73, 76)]
+
+
+@pytest.fixture
+def table():
+    return ChordTable(combo_voicings(D_MAJOR))
+
+
+def test_single_fingers_play_their_own_chords(table):
+    for i, notes in enumerate(D_MAJOR):
+        assert table.notes[1 << i] == notes
+    assert table.notes[0] == ()
+    assert table.names[0b00001] == "D Major"
+
+
+def test_higher_fingers_add_extensions(table):
+    # Thumb + index: D major plus the 7th (C#), named after the base chord
+    assert table.notes[0b00011] == (62, 66, 69, 73)
+    assert table.names[0b00011] == "D Major +7"
+    assert table.notes[0b11111] == (62, 66, 69, 73, 76, 79, 83)
+
+
+def test_transitions_hold_only_the_notes_that_differ(table):
+    for prev in range(NUM_MASKS):
+        for mask in range(NUM_MASKS):
+            note_ons, note_offs = table.transition(prev, mask)
+            old, new = set(table.notes[prev]), set(table.notes[mask])
+            assert note_ons == tuple(sorted(new - old))
+            assert note_offs == tuple(sorted(old - new))
+    # D major -> F# minor keeps F# and A sounding
+    assert table.transition(0b00001, 0b00100) == ((73,), (62,))
+
+
+def test_fingers_without_a_chord_are_ignored():
+    table = ChordTable(combo_voicings([None, (64, 67, 71), (), None, None]))
+    assert table.notes[0b00001] == ()
+    assert table.notes[0b00011] == (64, 67, 71)
+
+
+def test_wrong_number_of_voicings_is_rejected():
+    with pytest.raises(ValueError):
+        ChordTable([((60,), "C")] * 31)
@@ -0,0 +1,126 @@
+"""
+GestureEngine must produce the same note events as the live loop (update_chords)
+"""
+
+import contextlib
+import heapq
+import io
+import itertools
+
+import numpy as np
+import pytest
+
+from benchmark import synthetic_landmark_stream
+from chord_mapping import CHORD_MODE_COMBO, CHORD_MODE_FINGERS, HANDS
+from gesture_engine import GestureEngine
+from midi_output import MemoryMidiBackend, MidiOutput, NOTE_ON
+
+FRAME_TIME = 0.25  # Exact in binary, so sustained releases land exactly on frames
+
+
+class SimulatedScheduler:
+    """NoteScheduler stand-in whose clock only moves when advance() is called"""
+    def __init__(self):
+        self.now = 0.0
+        self._heap = []
+        self._pending = {}
+        self._seq = itertools.count()
+
+    def schedule(self, key, delay, callback, *args):
+        entry = (self.now + delay, next(self._seq), key, callback, args)
+        self._pending[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def cancel(self, key):
+        return self._pending.pop(key, None) is not None
+
+    def is_pending(self, key):
+        return key in self._pending
+
+    def __len__(self):
+        return len(self._pending)
+
+    def advance(self, until):
+        """Run every event due at or before `until`, in due order"""
+        while self._heap and self._heap[0][0] <= until:
+            entry = heapq.heappop(self._heap)
+            due, _, key, callback, args = entry
+            if self._pending.get(key) is not entry:
+                continue  # Cancelled or replaced
+            del self._pending[key]
+            self.now = due
+            callback(*args)
+        self.now = until
+
+    def stop(self, run_pending=True):
+        if run_pending:
+            self.advance(float("inf"))
+
+
+class ClockRecorder:
+    """MidiOutput recorder that stamps each event with the simulated time"""
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.events = []
+
+    def record(self, status, data1, data2):
+        self.events.append((self.scheduler.now, data1, data2 if status & 0xF0 == NOTE_ON else 127,
+                            status & 0xF0 == NOTE_ON, status & 0x0F))
+
+
+@pytest.fixture(scope="module")
+def app():
+    with contextlib.redirect_stdout(io.StringIO()):
+        import air_piano_main as app
+    return app
+
+
+def live_events(app, mode, sustain, timestamps, landmarks, handedness):
+    scheduler = SimulatedScheduler()
+    recorder = ClockRecorder(scheduler)
+    saved = (app.note_scheduler, app.midi_out, app.MIDI_AVAILABLE, app.SYNTH_ACTIVE,
+             app.SOUND_AVAILABLE, app.SUSTAIN_TIME, app.chord_mode)
+    app.note_scheduler = scheduler
+    app.midi_out = MidiOutput(MemoryMidiBackend())
+    app.midi_out.recorder = recorder
+    app.MIDI_AVAILABLE, app.SYNTH_ACTIVE, app.SOUND_AVAILABLE = True, False, False
+    app.SUSTAIN_TIME, app.chord_mode = sustain, mode
+    app.voices.release_all()
+    app.prev_states = {hand: 0 for hand in HANDS}
+    app.current_chords.clear()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for t, frame in zip(timestamps, landmarks):
+                scheduler.advance(t)
+                app.update_chords(frame, handedness)
+            # The empty frame a replay ends with, then let the sustain run out
+            app.update_chords(landmarks[:0], handedness[:0])
+            scheduler.stop()
+    finally:
+        (app.note_scheduler, app.midi_out, app.MIDI_AVAILABLE, app.SYNTH_ACTIVE,
+         app.SOUND_AVAILABLE, app.SUSTAIN_TIME, app.chord_mode) = saved
+    return recorder.events
+
+
+@pytest.mark.parametrize("mode", [CHORD_MODE_FINGERS, CHORD_MODE_COMBO])
+@pytest.mark.parametrize("sustain", [0.0, FRAME_TIME, 2.0])
+def test_engine_matches_update_chords(app, mode, sustain):
+    landmarks, handedness, _ = synthetic_landmark_stream(frames=300, hold=3, seed=7)
+    timestamps = np.arange(len(landmarks)) * FRAME_TIME
+    expected = live_events(app, mode, sustain, timestamps, landmarks, handedness)
+    events = GestureEngine(app.active_mapping, mode, sustain).events(timestamps, landmarks, handedness)
+    actual = [(float(e["time"]), int(e["note"]), int(e["velocity"]), bool(e["on"]), int(e["channel"]))
+              for e in events]
+    assert expected
+    assert sorted(actual) == sorted(expected)
+
+
+def test_hand_that_leaves_the_frame_keeps_its_chord():
+    landmarks, handedness, masks = synthetic_landmark_stream(frames=12, hold=12, seed=3)
+    engine = GestureEngine()
+    # Only the left hand after frame 6: the right hand's mask holds
+    split = np.array([handedness] * len(landmarks))
+    split[6:, 1] = 255
+    states = engine.hand_states(landmarks, split)
+    assert (states[:, 0] == masks[:, 0]).all()
+    assert (states[:, 1] == masks[0, 1]).all()
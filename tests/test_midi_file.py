@@ -0,0 +1,48 @@
+"""
+Tests for the Standard MIDI File writer
+"""
+
+import struct
+
+import numpy as np
+import pytest
+
+from gesture_engine import EVENT_DTYPE
+from midi_file import MidiFileWriter, vlq, write_midi_file
+
+HEADER = b"MThd" + struct.pack(">IHHH", 6, 0, 1, 1000)
+TEMPO_EVENT = b"\x00\xff\x51\x03\x0f\x42\x40"  # 1,000,000 us per quarter
+END_OF_TRACK = b"\x00\xff\x2f\x00"
+
+
+def track(body):
+    return b"MTrk" + struct.pack(">I", len(body)) + body
+
+
+@pytest.mark.parametrize("value, encoded", [
+    (0, b"\x00"), (0x7F, b"\x7f"), (0x80, b"\x81\x00"), (0x3FFF, b"\xff\x7f"), (0x200000, b"\x81\x80\x80\x00"),
+])
+def test_vlq(value, encoded):
+    assert vlq(value) == encoded
+
+
+def test_file_is_complete_after_every_flush(tmp_path):
+    path = tmp_path / "session.mid"
+    with MidiFileWriter(str(path)) as midi:
+        assert path.read_bytes() == HEADER + track(TEMPO_EVENT + END_OF_TRACK)
+        midi.note_on(0.0, 62, 100)
+        midi.note_off(0.5, 62, channel=1)
+        midi.flush()
+        assert path.read_bytes() == HEADER + track(
+            TEMPO_EVENT + b"\x00\x90\x3e\x64" + b"\x83\x74\x81\x3e\x7f" + END_OF_TRACK)
+        midi.note_on(0.4, 64)  # Earlier than the last event: clamped to it
+    assert path.read_bytes() == HEADER + track(
+        TEMPO_EVENT + b"\x00\x90\x3e\x64" + b"\x83\x74\x81\x3e\x7f" + b"\x00\x90\x40\x7f" + END_OF_TRACK)
+
+
+def test_write_midi_file_takes_engine_events(tmp_path):
+    path = tmp_path / "engine.mid"
+    events = np.array([(0.25, 66, 90, True, 0), (1.0, 66, 127, False, 0)], dtype=EVENT_DTYPE)
+    write_midi_file(str(path), events)
+    assert path.read_bytes() == HEADER + track(
+        TEMPO_EVENT + b"\x81\x7a\x90\x42\x5a" + b"\x85\x6e\x80\x42\x7f" + END_OF_TRACK)
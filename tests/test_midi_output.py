@@ -0,0 +1,72 @@
+"""
+Tests for MidiOutput batching and the in-memory backend
+"""
+
+import threading
+import time
+
+from midi_output import MemoryMidiBackend, MidiOutput, NOTE_OFF, NOTE_ON
+
+
+def test_events_are_batched_until_flush():
+    backend = MemoryMidiBackend()
+    out = MidiOutput(backend, channel=2)
+    out.note_on(62, 100)
+    out.note_off(66, channel=5)
+    assert backend.batches == []
+    assert out.flush() == 2
+    assert out.flush() == 0
+    assert len(backend.batches) == 1
+    assert [message for message, _ in backend.events] == [[NOTE_ON | 2, 62, 100], [NOTE_OFF | 5, 66, 127]]
+
+
+def test_recorder_gets_a_copy_of_every_event():
+    recorded = []
+
+    class Recorder:
+        def record(self, status, data1, data2):
+            recorded.append((status, data1, data2))
+
+    out = MidiOutput(MemoryMidiBackend())
+    out.recorder = Recorder()
+    out.note_on(60)
+    out.note_off(60)
+    assert recorded == [(NOTE_ON, 60, 127), (NOTE_OFF, 60, 127)]
+
+
+class SlowBackend(MemoryMidiBackend):
+    """Fails the test if two writes ever overlap"""
+    def __init__(self):
+        super().__init__()
+        self.writing = False
+        self.overlaps = 0
+
+    def write(self, events):
+        if self.writing:
+            self.overlaps += 1
+        self.writing = True
+        time.sleep(0.0005)
+        super().write(events)
+        self.writing = False
+
+
+def test_flushes_from_two_threads_never_overlap_and_keep_order():
+    backend = SlowBackend()
+    out = MidiOutput(backend)
+
+    def play(base):
+        for note in range(base, base + 40):
+            out.note_on(note)
+            out.flush()
+
+    threads = [threading.Thread(target=play, args=(base,)) for base in (0, 64)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert backend.overlaps == 0
+    notes = [message[1] for message, _ in backend.events]
+    assert sorted(notes) == list(range(40)) + list(range(64, 104))
+    # Each thread's notes arrive in the order it queued them
+    assert [n for n in notes if n < 64] == list(range(40))
+    assert [n for n in notes if n >= 64] == list(range(64, 104))
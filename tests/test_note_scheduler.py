@@ -0,0 +1,81 @@
+"""
+Tests for NoteScheduler: ordering, replace/cancel/reschedule and failures
+"""
+
+import threading
+import time
+
+from note_scheduler import NoteScheduler
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate() and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    return predicate()
+
+
+def test_events_fire_in_due_order():
+    scheduler = NoteScheduler()
+    fired = []
+    for key, delay in (("c", 0.03), ("a", 0.01), ("b", 0.02)):
+        scheduler.schedule(key, delay, fired.append, key)
+    assert wait_for(lambda: len(fired) == 3)
+    assert fired == ["a", "b", "c"]
+    scheduler.stop()
+
+
+def test_schedule_replaces_and_cancel_removes():
+    scheduler = NoteScheduler()
+    fired = []
+    scheduler.schedule("k", 0.01, fired.append, "first")
+    scheduler.schedule("k", 0.02, fired.append, "second")
+    scheduler.schedule("gone", 0.01, fired.append, "gone")
+    assert scheduler.cancel("gone")
+    assert not scheduler.cancel("gone")
+    assert wait_for(lambda: fired)
+    time.sleep(0.03)
+    assert fired == ["second"]
+    scheduler.stop()
+
+
+def test_reschedule_never_fires_an_event_twice():
+    scheduler = NoteScheduler()
+    counts = {}
+    lock = threading.Lock()
+
+    def fire(key):
+        with lock:
+            counts[key] = counts.get(key, 0) + 1
+
+    for key in range(500):
+        scheduler.schedule(key, 0.0003, fire, key)
+        time.sleep(0.0002)
+        scheduler.reschedule(key, 0.0002)
+    assert wait_for(lambda: len(counts) == 500)
+    scheduler.stop()
+    assert set(counts.values()) == {1}
+    assert not scheduler.reschedule("missing", 1.0)
+
+
+def test_failing_callback_keeps_the_timer_running():
+    scheduler = NoteScheduler()
+    fired = []
+
+    def fail():
+        raise RuntimeError("PortMidi error")
+
+    scheduler.schedule("bad", 0.0, fail)
+    scheduler.schedule("good", 0.01, fired.append, "good")
+    assert wait_for(lambda: fired)
+    scheduler.schedule("later", 0.0, fired.append, "later")
+    assert wait_for(lambda: len(fired) == 2)
+    scheduler.stop()
+
+
+def test_stop_runs_pending_events():
+    scheduler = NoteScheduler()
+    fired = []
+    scheduler.schedule("off", 10.0, fired.append, "off")
+    scheduler.stop()
+    assert fired == ["off"] and len(scheduler) == 0
@@ -0,0 +1,36 @@
+"""
+Tests for offline rendering with the built-in synth
+"""
+
+import numpy as np
+
+from soft_synth import ADSR, SoftSynth
+
+SAMPLE_RATE = 8000
+
+
+def synth():
+    return SoftSynth(sample_rate=SAMPLE_RATE, block_size=64, envelope=ADSR(release=0.2))
+
+
+def test_no_events_render_silence():
+    audio = synth().render_events([], duration=0.5)
+    assert audio.shape == (4000, 2)
+    assert audio.dtype == np.float32
+    assert not audio.any()
+
+
+def test_note_sounds_from_its_block_and_fades_after_release():
+    audio = synth().render_events([(0.1, 69, 127, True), (0.3, 69, 0, False)])
+    # Default duration covers the last event, the release tail and 0.1 s
+    assert len(audio) == int((0.3 + 0.2 + 0.1) * SAMPLE_RATE)
+    start = 0.1 * SAMPLE_RATE // 64 * 64  # Events land at the start of their block
+    assert not audio[:int(start)].any()
+    assert np.abs(audio[int(start):int(start) + 64]).max() > 0
+    assert np.abs(audio[int(0.2 * SAMPLE_RATE):int(0.3 * SAMPLE_RATE)]).max() > 0.01
+    assert np.abs(audio[int(0.55 * SAMPLE_RATE):]).max() == 0
+
+
+def test_rendering_is_deterministic():
+    events = [(0.0, 62, 100, True), (0.05, 66, 100, True), (0.2, 62, 0, False), (0.25, 66, 0, False)]
+    assert np.array_equal(synth().render_events(events), synth().render_events(events))
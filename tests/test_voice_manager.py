@@ -0,0 +1,59 @@
+"""
+Tests for VoiceManager reference counting
+"""
+
+import threading
+
+from voice_manager import VoiceManager
+
+
+def test_shared_notes_start_once_and_stop_with_the_last_chord():
+    voices = VoiceManager()
+    assert voices.press([62, 66, 69]) == [62, 66, 69]
+    assert voices.press([66, 69, 73]) == [73]
+    assert voices.release([62, 66, 69]) == [62]
+    assert voices.active_voices() == {66, 69, 73}
+    assert voices.release([66, 69, 73]) == [66, 69, 73]
+    assert len(voices) == 0
+
+
+def test_channels_are_counted_separately():
+    voices = VoiceManager()
+    assert voices.press([(0, 66), (1, 66)]) == [(0, 66), (1, 66)]
+    assert voices.release([(0, 66)]) == [(0, 66)]
+    assert voices.is_active((1, 66))
+
+
+def test_unbalanced_release_is_ignored():
+    voices = VoiceManager()
+    assert voices.release([60]) == []
+    voices.press([60])
+    assert voices.release([60, 60]) == [60]
+
+
+def test_release_all_returns_sounding_notes():
+    voices = VoiceManager()
+    voices.press([64, 60, 60])
+    assert voices.release_all() == [60, 64]
+    assert len(voices) == 0
+
+
+def test_callbacks_follow_count_changes_across_threads():
+    """Events queued by the callbacks always alternate on/off for each note"""
+    voices = VoiceManager()
+    events = []
+    on, off = (lambda note: events.append((note, True))), (lambda note: events.append((note, False)))
+
+    def hammer():
+        for _ in range(2000):
+            voices.press([60], on)
+            voices.release([60], off)
+
+    threads = [threading.Thread(target=hammer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    states = [is_on for _, is_on in events]
+    assert states[0] and not states[-1]
+    assert all(a != b for a, b in zip(states, states[1:]))
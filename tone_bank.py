@@ -0,0 +1,69 @@
+"""
+Fallback tones for Air-Piano when no MIDI device is available
+Waveforms are generated with NumPy in one shot and kept in a bounded
+cache of pygame.mixer.Sound objects, so triggering a chord is O(1).
+"""
+
+from collections import OrderedDict
+import numpy as np
+
+SAMPLE_RATE = 22050  # Must match pygame.mixer.init(frequency=...)
+FADE_FRACTION = 0.1  # Fade in/out over 10% of the tone to avoid clicks
+
+
+def midi_to_frequency(note):
+    """Equal-tempered frequency of a MIDI note (A4 = 69 = 440 Hz)"""
+    return 440.0 * 2.0 ** ((note - 69) / 12.0)
+
+
+def render_tone(frequencies, duration, sample_rate=SAMPLE_RATE):
+    """Render a mix of sine waves as a stereo int16 array.
+
+    Each frequency gets an equal share of full scale, so a three-note chord
+    peaks at the same level as a single beep.
+    """
+    frames = int(duration * sample_rate)
+    i = np.arange(frames)
+    ramp = frames * FADE_FRACTION
+    fade = np.minimum(np.minimum(i / ramp, (frames - i) / ramp), 1.0)
+    phase = (2 * np.pi / sample_rate) * np.outer(i, np.asarray(frequencies, dtype=np.float64))
+    wave = np.sin(phase).mean(axis=1) * fade
+    mono = (wave * 32767).astype(np.int16)
+    return np.column_stack((mono, mono))  # Left and right channels
+
+
+class SoundBank:
+    """LRU cache of rendered pygame Sound objects keyed by frequencies and duration"""
+    def __init__(self, max_sounds=64, duration=0.3, sample_rate=SAMPLE_RATE):
+        self.max_sounds = max_sounds
+        self.duration = duration
+        self.sample_rate = sample_rate
+        self._sounds = OrderedDict()
+
+    def get(self, frequencies, duration=None):
+        duration = self.duration if duration is None else duration
+        key = (tuple(round(f, 3) for f in frequencies), duration)
+        sound = self._sounds.get(key)
+        if sound is None:
+            import pygame.sndarray
+            sound = pygame.sndarray.make_sound(render_tone(key[0], duration, self.sample_rate))
+            self._sounds[key] = sound
+            if len(self._sounds) > self.max_sounds:
+                self._sounds.popitem(last=False)  # Evict least recently used
+        else:
+            self._sounds.move_to_end(key)
+        return sound
+
+    def get_chord(self, notes, duration=None):
+        return self.get(sorted(midi_to_frequency(n) for n in notes), duration)
+
+    def prerender(self, chord_list):
+        """Render every chord up front so the first trigger is as cheap as the rest"""
+        for notes in chord_list:
+            self.get_chord(notes)
+
+    def play_chord(self, notes, duration=None):
+        self.get_chord(notes, duration).play()
+
+    def __len__(self):
+        return len(self._sounds)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Offline video-to-MIDI transcription for Air-Piano
+Runs HandDetector and the chord logic over a recorded video without a
+window and writes a Standard MIDI File. The video is split into chunks
+that worker processes detect in parallel; each chunk starts a fresh
+detector a few frames early so MediaPipe's tracking is warmed up by the
+chunk boundary, and the chunks' landmarks are merged in frame order before
+one GestureEngine pass turns the whole session into notes. Event times
+come from frame indices (frame / fps), not from wall-clock time.
+
+    python transcribe.py session.mp4 -o session.mid --workers 4
+    python transcribe.py session.mp4 --chord-mode combo --mapping chord_mapping.json
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import time
+import cv2
+import numpy as np
+
+from chord_mapping import CHORD_MODE_FINGERS, CHORD_MODE_COMBO, load_mapping
+from detection_pipeline import MAX_HANDS
+from gesture_engine import GestureEngine
+from landmark_recording import HAND_NONE, NUM_LANDMARKS
+from midi_file import write_midi_file, PPQ, TEMPO
+
+
+def video_info(path):
+    """(frame count, fps) of a video file"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Could not open video file: {path}")
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    if count <= 0:
+        raise ValueError(f"Video reports no frame count ({count}), so it cannot be split into chunks: {path}")
+    return count, fps
+
+
+def plan_chunks(frame_count, chunk_frames, warmup_frames):
+    """(first frame read, first frame kept, end) per chunk; chunks overlap by warmup_frames.
+
+    The last chunk's end is None: it reads to the end of the file, since
+    containers' frame counts are estimates and may be too low.
+    """
+    starts = range(0, frame_count, chunk_frames)
+    return [(max(0, start - warmup_frames), start, start + chunk_frames if start != starts[-1] else None)
+            for start in starts]
+
+
+def detect_chunk(job):
+    """Detect hands on frames [start, end) of a video (runs in a worker process).
+
+    Frames from `first` up to `start` only warm up the new detector's tracking;
+    end None reads until the video runs out.
+    Returns (frame indices, landmarks (n, MAX_HANDS, 21, 2), handedness (n, MAX_HANDS)).
+    """
+    from hand_detector import HandDetector  # Imports MediaPipe in the worker
+    path, (first, start, end), mirror, detector_kwargs = job
+    cap = cv2.VideoCapture(path)
+    if first:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+    detector = HandDetector(**detector_kwargs)
+    capacity = end - start if end is not None else 1024
+    landmarks = np.zeros((capacity, MAX_HANDS, NUM_LANDMARKS, 2), dtype=np.int32)
+    handedness = np.full((capacity, MAX_HANDS), HAND_NONE, dtype=np.uint8)
+    read = 0
+    index = first
+    while end is None or index < end:
+        success, img = cap.read()
+        if not success:
+            break
+        if read == len(landmarks):  # Open-ended chunk outgrew its buffers
+            landmarks = np.concatenate([landmarks, np.zeros_like(landmarks)])
+            handedness = np.concatenate([handedness, np.full_like(handedness, HAND_NONE)])
+        if mirror:
+            img = cv2.flip(img, 1)  # Same mirror image the live app detects on
+        hand_landmarks, hand_codes, _ = detector.findHandsArray(img, draw=False)
+        if index >= start:
+            n = min(len(hand_codes), MAX_HANDS)
+            landmarks[read, :n] = hand_landmarks[:n]
+            handedness[read, :n] = hand_codes[:n]
+            read += 1
+        index += 1
+    cap.release()
+    return np.arange(start, start + read), landmarks[:read], handedness[:read]
+
+
+def transcribe(path, workers=0, chunk_seconds=30.0, warmup_seconds=1.0, mirror=True,
+               detector_kwargs=None, on_chunk=None):
+    """Detect every frame of a video in parallel chunks.
+
+    Returns (timestamps, landmarks, handedness) for the whole video in frame
+    order, ready for GestureEngine.events. workers=0 detects in this process.
+    on_chunk(done, total) is called as chunks finish.
+    """
+    frame_count, fps = video_info(path)
+    chunks = plan_chunks(frame_count, max(1, int(chunk_seconds * fps)), int(warmup_seconds * fps))
+    jobs = [(path, chunk, mirror, detector_kwargs or {}) for chunk in chunks]
+    results = []
+    if workers:
+        with mp.get_context().Pool(workers) as pool:
+            for result in pool.imap(detect_chunk, jobs):  # imap keeps chunk order
+                results.append(result)
+                if on_chunk:
+                    on_chunk(len(results), len(jobs))
+    else:
+        for job in jobs:
+            results.append(detect_chunk(job))
+            if on_chunk:
+                on_chunk(len(results), len(jobs))
+    if not results:
+        empty = np.zeros(0)
+        return empty, empty.reshape(0, MAX_HANDS, NUM_LANDMARKS, 2), empty.reshape(0, MAX_HANDS)
+    indices = np.concatenate([r[0] for r in results])
+    return (indices / fps, np.concatenate([r[1] for r in results]),
+            np.concatenate([r[2] for r in results]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe an Air-Piano video to a MIDI file")
+    parser.add_argument("video", help="recorded video file")
+    parser.add_argument("-o", "--output", metavar="PATH", help="MIDI file to write (default: <video>.mid)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, metavar="N",
+                        help="detection worker processes (0 = detect in this process)")
+    parser.add_argument("--chunk-seconds", type=float, default=30.0,
+                        help="seconds of video per work unit (default 30)")
+    parser.add_argument("--warmup-seconds", type=float, default=1.0,
+                        help="frames before each chunk run through its detector first (default 1 s)")
+    parser.add_argument("--no-mirror", action="store_true",
+                        help="the video is already mirrored; do not flip frames like the live app")
+    parser.add_argument("--chord-mode", choices=[CHORD_MODE_FINGERS, CHORD_MODE_COMBO], default=CHORD_MODE_FINGERS)
+    parser.add_argument("--mapping", metavar="PATH", help="JSON chord mapping (default: built-in D major)")
+    parser.add_argument("--sustain", type=float, default=2.0, help="seconds a released chord keeps sounding")
+    parser.add_argument("--inference-width", type=int, metavar="PIXELS",
+                        help="downscale frames to this width before hand detection")
+    parser.add_argument("--keyframe-interval", type=int, default=1, metavar="N",
+                        help="run MediaPipe every N frames and track with optical flow in between")
+    parser.add_argument("--ppq", type=int, default=PPQ, help=f"MIDI ticks per quarter note (default {PPQ} = 1 ms)")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.video)[0] + ".mid"
+    try:
+        mapping = load_mapping(args.mapping) if args.mapping else None
+        frame_count, fps = video_info(args.video)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    print(f"🎬 {args.video}: {frame_count} frames at {fps:.2f} FPS ({frame_count / fps:.1f} s), "
+          f"{args.workers or 'no'} worker processes")
+
+    start = time.perf_counter()
+    timestamps, landmarks, handedness = transcribe(
+        args.video, workers=args.workers, chunk_seconds=args.chunk_seconds,
+        warmup_seconds=args.warmup_seconds, mirror=not args.no_mirror,
+        detector_kwargs={"detectionCon": 0.8, "inference_width": args.inference_width,
+                         "keyframe_interval": args.keyframe_interval},
+        on_chunk=lambda done, total: print(f"   chunk {done}/{total} done"))
+    detection_s = time.perf_counter() - start
+    events = GestureEngine(mapping, args.chord_mode, args.sustain).events(timestamps, landmarks, handedness)
+    write_midi_file(output, events, ppq=args.ppq, tempo=TEMPO)
+    elapsed = time.perf_counter() - start
+
+    duration = len(timestamps) / fps
+    print(f"💾 {int(events['on'].sum())} notes written to {output}")
+    print(f"⚡ {duration:.1f} s of video in {elapsed:.1f} s ({duration / elapsed:.2f}x real time; "
+          f"detection {detection_s:.1f} s, chord logic and MIDI {elapsed - detection_s:.2f} s)")
+
+
+if __name__ == "__main__":
+    mp.freeze_support()
+    main()
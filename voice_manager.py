@@ -0,0 +1,72 @@
+"""
+Voice manager for Air-Piano
+Reference-counts MIDI notes across every held chord and both hands, so
+shared notes are only switched on by the first chord that needs them and
+only switched off by the last one to let go.
+"""
+
+import threading
+
+
+class VoiceManager:
+    """Tracks how many held chords need each MIDI note.
+
+    press() and release() return only the notes whose sounding state
+    actually changed; everything else is redundant MIDI traffic. Their
+    optional callback is called for each of those notes while the lock is
+    held, so events it queues are in the same order as the count changes
+    even when the frame loop and the scheduler thread race.
+    """
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()  # Note-offs arrive from the scheduler thread
+
+    def press(self, notes, on_start=None):
+        """Add one reference to each note. Returns the notes that just started."""
+        started = []
+        with self._lock:
+            for note in notes:
+                count = self._counts.get(note, 0)
+                if count == 0:
+                    started.append(note)
+                    if on_start is not None:
+                        on_start(note)
+                self._counts[note] = count + 1
+        return started
+
+    def release(self, notes, on_stop=None):
+        """Drop one reference from each note. Returns the notes that just stopped."""
+        stopped = []
+        with self._lock:
+            for note in notes:
+                count = self._counts.get(note, 0)
+                if count == 0:
+                    continue  # Not held; ignore unbalanced releases
+                if count == 1:
+                    del self._counts[note]
+                    stopped.append(note)
+                    if on_stop is not None:
+                        on_stop(note)
+                else:
+                    self._counts[note] = count - 1
+        return stopped
+
+    def release_all(self):
+        """Forget every reference. Returns the notes that were sounding."""
+        with self._lock:
+            stopped = sorted(self._counts)
+            self._counts.clear()
+        return stopped
+
+    def active_voices(self):
+        """Set of MIDI notes currently sounding"""
+        with self._lock:
+            return frozenset(self._counts)
+
+    def is_active(self, note):
+        with self._lock:
+            return note in self._counts
+
+    def __len__(self):
+        with self._lock:
+            return len(self._counts)